@@ -1,9 +1,16 @@
+import os
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 # Use relative imports instead of absolute
 from .routers import deck_router, enrich_router, mapping_router
 
+# INFO by default; set LOG_LEVEL=DEBUG to see per-word traces
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+                    format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
 app = FastAPI(title="CSV to Anki API")
 
 # Configure CORS
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form, BackgroundTasks, Response
 from fastapi.responses import FileResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
 import os
 import shutil
 import tempfile
@@ -263,7 +264,8 @@ async def create_anki_deck(
                 
             # Save the package to a temporary file
             temp_file_path = os.path.join(temp_dir, f"{deck_name.replace(' ', '_')}.apkg")
-            anki_package.write_to_file(temp_file_path)
+            # Zipping runs in a worker thread so the event loop stays responsive
+            await run_in_threadpool(anki_package.write_to_file, temp_file_path)
             print(f"Created Anki package at: {temp_file_path}")
             
             # Store information for download with a sanitized ID
@@ -626,10 +628,9 @@ async def preview_anki_cards(
 async def serve_preview_audio(filename: str):
     """Serve audio files generated for preview purposes"""
     try:
-        # Look for the audio file in the enrich service temp directory
-        from ..services.enrich_service import EnrichService
-        enrich_service = EnrichService()
-        audio_path = os.path.join(enrich_service.temp_dir, filename)
+        # Preview audio is served from the shared TTS cache
+        from ..services.enrich_service import AUDIO_CACHE_DIR
+        audio_path = os.path.join(AUDIO_CACHE_DIR, os.path.basename(filename))
         
         if not os.path.exists(audio_path):
             raise HTTPException(status_code=404, detail="Audio file not found")
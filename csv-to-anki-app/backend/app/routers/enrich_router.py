@@ -2,7 +2,8 @@
 Router for vocabulary enrichment endpoints
 """
 from fastapi import APIRouter, File, Form, UploadFile, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from datetime import datetime
 import os
 import tempfile
@@ -12,6 +13,8 @@ from typing import List, Dict, Optional
 import json
 import shutil
 import uuid
+import itertools
+from urllib.parse import quote
 
 from ..services.enrich_service import EnrichService
 
@@ -79,33 +82,24 @@ async def upload_and_enrich_vocabulary(
         if len(japanese_words) > 100:
             japanese_words = japanese_words[:100]
             
-        # Create enriched data
-        enriched_data = enrich_service.enrich_vocabulary(japanese_words)
-        
-        # Create a new CSV file
-        temp_dir = tempfile.mkdtemp()
         output_filename = f"enriched_{file.filename.split('.')[0]}.csv"
-        output_path = os.path.join(temp_dir, output_filename)
         
-        # Create the CSV content
-        csv_content = enrich_service.create_enriched_csv(
+        # Stream the CSV as words are enriched, so the first rows arrive
+        # without waiting for the whole list. Words that fail are logged and written
+        # without enrichment, since errors after this point can't change the status.
+        csv_rows = enrich_service.iter_enriched_csv_rows(
             japanese_words, 
             include_examples=include_examples, 
             include_audio=include_audio
         )
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(csv_content)
-        
-        # Clean up the temporary directory after response is sent
-        if background_tasks:
-            background_tasks.add_task(shutil.rmtree, temp_dir)
+        # Produce the first line here, so a failure setting up the CSV is still a 500
+        first_line = next(csv_rows)
         
-        return FileResponse(
-            path=output_path,
-            filename=output_filename,
+        return StreamingResponse(
+            itertools.chain([first_line], csv_rows),
             media_type="text/csv",
-            background=background_tasks
+            headers={"Content-Disposition": f"attachment; filename*=utf-8''{quote(output_filename)}"}
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
@@ -145,10 +139,8 @@ async def get_word_audio(word: str, background_tasks: BackgroundTasks):
         audio_path = enrich_service.generate_audio(word)
         if not audio_path or not os.path.exists(audio_path):
             raise HTTPException(status_code=404, detail="Audio generation failed")
-        
-        # Clean up the file after it's sent
-        background_tasks.add_task(os.unlink, audio_path)
-        
+
+        # The file lives in the shared TTS cache, so it is kept for later requests
         return FileResponse(
             path=audio_path,
             filename=f"{word}.mp3",
@@ -343,8 +335,8 @@ async def create_deck_from_collection(
                 # Use basic deck service for simple decks
                 anki_package = deck_service.create_anki_package(deck)
                 
-            # Write the package to file
-            anki_package.write_to_file(deck_path)
+            # Write the package to file in a worker thread
+            await run_in_threadpool(anki_package.write_to_file, deck_path)
             
         except Exception as e:
             # Clean up on error
@@ -1,9 +1,101 @@
 import os
+import mmap
 import tempfile
 import csv
 import random
 from io import StringIO
 import genanki
+from .tags import TAG_TABLE
+
+class NoSyncPackage(genanki.Package):
+    """
+    genanki.Package that builds its collection database without a journal or fsyncs
+
+    The database is a scratch file that is zipped and deleted, so durability
+    is not needed; the notes are written in one transaction that genanki
+    commits once.
+    """
+
+    def write_to_db(self, cursor, timestamp, id_gen):
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        super().write_to_db(cursor, timestamp, id_gen)
+
+
+# Anki model for Japanese vocabulary; notes only reference it, so one instance serves every package
+JAPANESE_ENHANCED_MODEL_ID = 1607392319
+JAPANESE_ENHANCED_MODEL = genanki.Model(
+    JAPANESE_ENHANCED_MODEL_ID,
+    'Japanese Enhanced',
+    fields=[
+        {'name': 'Front'},      # Japanese word
+        {'name': 'Back'},       # English translation
+        {'name': 'Reading'},    # Reading in hiragana/katakana or romaji
+        {'name': 'Example'},    # Example sentence  
+        {'name': 'Audio'},      # Audio pronunciation
+        {'name': 'ExampleAudio'},  # Audio for example sentence
+    ],
+    templates=[
+        {
+            'name': 'Card 1',
+            'qfmt': '{{Front}}<br>{{#Audio}}{{Audio}}{{/Audio}}',  # Audio field contains [sound:xxx] format
+            'afmt': '''{{FrontSide}}
+<hr id="answer">
+<div class="meaning">{{Back}}</div>
+{{#Reading}}<div class="reading">Reading: {{Reading}}</div>{{/Reading}}
+{{#Example}}
+<div class="example">
+    Example: {{Example}}
+    {{#ExampleAudio}}
+    <div class="example-audio">
+        <div class="example-audio-label">Example Audio:</div>
+        {{ExampleAudio}}
+    </div>
+    {{/ExampleAudio}}
+</div>
+{{/Example}}
+''',
+        },
+    ],
+    css='''.card {
+            font-family: arial;
+            font-size: 20px;
+            text-align: center;
+            color: black;
+            background-color: white;
+        }
+        .reading {
+            font-size: 16px;
+            color: #585858;
+            margin-top: 10px;
+        }
+        .example {
+            font-size: 16px;
+            color: #006699;
+            margin-top: 15px;
+            font-style: italic;
+        }
+        .meaning {
+            font-weight: bold;
+            color: #009933;
+        }
+        .example-audio {
+            margin-top: 8px;
+            padding: 6px;
+            background-color: #f0f5ff;
+            border-radius: 4px;
+            border: 1px solid #dde5ff;
+        }
+        .example-audio-label {
+            font-size: 12px;
+            color: #666;
+            margin-bottom: 4px;
+            font-weight: bold;
+        }
+        .audio-placeholder {
+            display: none;
+        }'''
+)
 
 def fix_anki_csv_format(csv_content):
     """
@@ -89,7 +181,7 @@ def fix_anki_csv_format(csv_content):
     
     return fixed_content
 
-def create_anki_package_from_csv(csv_content, deck_name, include_example_audio=False):
+def create_anki_package_from_csv(csv_content, deck_name, include_example_audio=False, model=None):
     """
     Create an Anki package from CSV content with improved error handling
     
@@ -97,6 +189,8 @@ def create_anki_package_from_csv(csv_content, deck_name, include_example_audio=F
         csv_content: The CSV content as a string
         deck_name: The name for the Anki deck
         include_example_audio: Whether to include audio for example sentences
+        model: genanki.Model with the six fields of JAPANESE_ENHANCED_MODEL,
+               defaults to that model
         
     Returns:
         genanki.Package object
@@ -105,79 +199,8 @@ def create_anki_package_from_csv(csv_content, deck_name, include_example_audio=F
     csv_content = fix_anki_csv_format(csv_content)
     
     # Set up the Anki model for Japanese vocabulary
-    model_id = 1607392319
-    model = genanki.Model(
-        model_id,
-        'Japanese Enhanced',
-        fields=[
-            {'name': 'Front'},      # Japanese word
-            {'name': 'Back'},       # English translation
-            {'name': 'Reading'},    # Reading in hiragana/katakana or romaji
-            {'name': 'Example'},    # Example sentence  
-            {'name': 'Audio'},      # Audio pronunciation
-            {'name': 'ExampleAudio'},  # Audio for example sentence
-        ],
-        templates=[
-            {
-                'name': 'Card 1',
-                'qfmt': '{{Front}}<br>{{#Audio}}{{Audio}}{{/Audio}}',  # Audio field contains [sound:xxx] format
-                'afmt': '''{{FrontSide}}
-<hr id="answer">
-<div class="meaning">{{Back}}</div>
-{{#Reading}}<div class="reading">Reading: {{Reading}}</div>{{/Reading}}
-{{#Example}}
-<div class="example">
-    Example: {{Example}}
-    {{#ExampleAudio}}
-    <div class="example-audio">
-        <div class="example-audio-label">Example Audio:</div>
-        {{ExampleAudio}}
-    </div>
-    {{/ExampleAudio}}
-</div>
-{{/Example}}
-''',
-            },
-        ],
-        css='''.card {
-            font-family: arial;
-            font-size: 20px;
-            text-align: center;
-            color: black;
-            background-color: white;
-        }
-        .reading {
-            font-size: 16px;
-            color: #585858;
-            margin-top: 10px;
-        }
-        .example {
-            font-size: 16px;
-            color: #006699;
-            margin-top: 15px;
-            font-style: italic;
-        }
-        .meaning {
-            font-weight: bold;
-            color: #009933;
-        }
-        .example-audio {
-            margin-top: 8px;
-            padding: 6px;
-            background-color: #f0f5ff;
-            border-radius: 4px;
-            border: 1px solid #dde5ff;
-        }
-        .example-audio-label {
-            font-size: 12px;
-            color: #666;
-            margin-bottom: 4px;
-            font-weight: bold;
-        }
-        .audio-placeholder {
-            display: none;
-        }'''
-    )
+    if model is None:
+        model = JAPANESE_ENHANCED_MODEL
     
     # Create deck
     deck_id = random.randrange(1 << 30, 1 << 31)
@@ -202,8 +225,20 @@ def create_anki_package_from_csv(csv_content, deck_name, include_example_audio=F
         content_for_csv = csv_content
     
     # Parse CSV content
+    # Fast path: with no quotes (or carriage returns) anywhere in the content, every
+    # separator is a field boundary, so str.split gives the same rows as the parsers
+    # below without their per-character quote tracking
+    if '"' not in content_for_csv and '\r' not in content_for_csv:
+        if dialect == 'excel-tab':
+            rows = [line.split('\t') if '\t' in line else line.split(',')
+                    for line in content_for_csv.strip().split('\n') if line.strip()]
+        else:
+            lines = content_for_csv.split('\n')
+            if lines[-1] == '':
+                lines.pop()  # csv.reader doesn't yield a row for the final newline
+            rows = [line.split(',') if line else [] for line in lines]
     # Check if content has already been split by commas
-    if dialect == 'excel-tab':
+    elif dialect == 'excel-tab':
         # Handle tab separated files properly
         lines = content_for_csv.strip().split('\n')
         rows = []
@@ -279,7 +314,7 @@ def create_anki_package_from_csv(csv_content, deck_name, include_example_audio=F
         start_idx = 1
     
     # Process rows and add cards
-    media_files = []
+    media_files = {}  # Ordered set: repeated words share one cached audio file
     cards_added = 0
     
     for i in range(start_idx, len(rows)):
@@ -301,7 +336,7 @@ def create_anki_package_from_csv(csv_content, deck_name, include_example_audio=F
         if tags_str:
             for tag in tags_str.replace(',', ' ').strip().split():
                 # Clean up tag
-                clean_tag = ''.join(c if c.isalnum() or c == '_' else '_' for c in tag)
+                clean_tag = tag.translate(TAG_TABLE)
                 if clean_tag:
                     tags.append(clean_tag)
         
@@ -320,7 +355,7 @@ def create_anki_package_from_csv(csv_content, deck_name, include_example_audio=F
                 audio_path = enrich_service.generate_audio(front)
                 if audio_path and os.path.exists(audio_path):
                     audio_filename = os.path.basename(audio_path)
-                    media_files.append(audio_path)
+                    media_files[audio_path] = None
                     print(f"Audio generated for '{front}': {audio_filename}")
                     
                     # Use proper Anki sound tag format
@@ -342,7 +377,7 @@ def create_anki_package_from_csv(csv_content, deck_name, include_example_audio=F
                 
                 if example_audio_path and os.path.exists(example_audio_path):
                     example_audio_filename = os.path.basename(example_audio_path)
-                    media_files.append(example_audio_path)
+                    media_files[example_audio_path] = None
                     print(f"✓ Example audio generated for: '{example}' - File: {example_audio_filename}")
                     
                     # Use proper Anki sound tag format
@@ -373,9 +408,9 @@ def create_anki_package_from_csv(csv_content, deck_name, include_example_audio=F
     if cards_added == 0:
         raise ValueError("Could not create any cards from CSV content")
         
-    package = genanki.Package([anki_deck])
+    package = NoSyncPackage([anki_deck])
     if media_files:
-        package.media_files = media_files
+        package.media_files = list(media_files)
         
     return package
 
@@ -604,7 +639,7 @@ def create_core2000_package_from_csv(csv_content, deck_name, include_example_aud
         start_idx = 1
     
     # Process rows and add cards - Core 2000 style cards
-    media_files = []
+    media_files = {}  # Ordered set: repeated words share one cached audio file
     cards_added = 0
     
     for i in range(start_idx, len(rows)):
@@ -627,7 +662,7 @@ def create_core2000_package_from_csv(csv_content, deck_name, include_example_aud
         if tags_str:
             for tag in tags_str.replace(',', ' ').strip().split():
                 # Clean up tag
-                clean_tag = ''.join(c if c.isalnum() or c == '_' else '_' for c in tag)
+                clean_tag = tag.translate(TAG_TABLE)
                 if clean_tag:
                     tags.append(clean_tag)
         
@@ -646,7 +681,7 @@ def create_core2000_package_from_csv(csv_content, deck_name, include_example_aud
                 audio_path = enrich_service.generate_audio(japanese)
                 if audio_path and os.path.exists(audio_path):
                     audio_filename = os.path.basename(audio_path)
-                    media_files.append(audio_path)
+                    media_files[audio_path] = None
                     print(f"Audio generated for '{japanese}': {audio_filename}")
                     
                     # Use proper Anki sound tag format
@@ -668,7 +703,7 @@ def create_core2000_package_from_csv(csv_content, deck_name, include_example_aud
                     example_audio_filename = os.path.basename(example_audio_path)
                     # Ensure the audio file is actually added to media_files
                     if example_audio_path not in media_files:
-                        media_files.append(example_audio_path)
+                        media_files[example_audio_path] = None
                         print(f"✓ Example audio added to media files: {example_audio_path}")
                     else:
                         print(f"✓ Example audio already in media files: {example_audio_path}")
@@ -725,8 +760,36 @@ def create_core2000_package_from_csv(csv_content, deck_name, include_example_aud
     if cards_added == 0:
         raise ValueError("Could not create any cards from CSV content")
         
-    package = genanki.Package([anki_deck])
+    package = NoSyncPackage([anki_deck])
     if media_files:
-        package.media_files = media_files
+        package.media_files = list(media_files)
         
     return package
+
+def create_core2000_package_from_file(csv_path, deck_name, include_example_audio=True):
+    """
+    Create a Core 2000 style Anki package from a CSV file on disk
+    
+    The file is memory-mapped and decoded straight from the mapping, so
+    large decks are not held in memory as both bytes and text.
+    
+    Args:
+        csv_path: Path to the UTF-8 CSV file
+        deck_name: The name for the Anki deck
+        include_example_audio: Whether to include audio for example sentences
+        
+    Returns:
+        genanki.Package object
+    """
+    with open(csv_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            csv_content = ''  # Empty files can't be mapped
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                csv_content = str(mm, 'utf-8')
+    
+    # Match the newline translation of a file opened in text mode
+    if '\r' in csv_content:
+        csv_content = csv_content.replace('\r\n', '\n').replace('\r', '\n')
+    
+    return create_core2000_package_from_csv(csv_content, deck_name, include_example_audio)
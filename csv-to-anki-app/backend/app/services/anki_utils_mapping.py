@@ -162,7 +162,7 @@ def create_anki_package_with_mapping(csv_content, deck_name, field_mapping=None,
         return None
     
     # Process rows and add cards
-    media_files = []
+    media_files = {}  # Ordered set: repeated words share one cached audio file
     cards_added = 0
     
     for row in rows:
@@ -273,7 +273,7 @@ def create_anki_package_with_mapping(csv_content, deck_name, field_mapping=None,
                 audio_path = enrich_service.generate_audio(front)
                 if audio_path and os.path.exists(audio_path):
                     audio_filename = os.path.basename(audio_path)
-                    media_files.append(audio_path)
+                    media_files[audio_path] = None
                     # Use proper Anki sound tag format
                     audio_field = f"[sound:{audio_filename}]"
                 else:
@@ -292,7 +292,7 @@ def create_anki_package_with_mapping(csv_content, deck_name, field_mapping=None,
                 
                 if example_audio_path and os.path.exists(example_audio_path):
                     example_audio_filename = os.path.basename(example_audio_path)
-                    media_files.append(example_audio_path)
+                    media_files[example_audio_path] = None
                     
                     # Use proper Anki sound tag format
                     example_audio_field = f"[sound:{example_audio_filename}]"
@@ -317,8 +317,9 @@ def create_anki_package_with_mapping(csv_content, deck_name, field_mapping=None,
     if cards_added == 0:
         raise ValueError("Could not create any cards from CSV content")
         
-    package = genanki.Package([anki_deck])
+    from .anki_utils import NoSyncPackage
+    package = NoSyncPackage([anki_deck])
     if media_files:
-        package.media_files = media_files
+        package.media_files = list(media_files)
         
     return package
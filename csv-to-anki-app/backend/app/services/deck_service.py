@@ -1,11 +1,46 @@
 from typing import List
 import csv
+import logging
 import random
 import os
 import genanki
+from collections import deque
 from io import StringIO
 from ..models import AnkiDeck, AnkiCard  # Use relative import
 
+logger = logging.getLogger(__name__)
+
+# Header written by EnrichService.create_enriched_csv
+_ENRICHED_HEADER = "Japanese,English,Reading,Example,Tags"
+
+
+def _parse_enriched_fast(rows, deck: AnkiDeck) -> None:
+    """
+    Add cards for rows of an enriched CSV (header already consumed)
+
+    Every column position is known up front, so each row is unpacked
+    directly instead of going through the general per-column checks.
+    """
+    for row in rows:
+        try:
+            front, back, reading, example, tags_str = row
+        except ValueError:
+            # Ragged row - pad/truncate to the five enriched columns
+            if len(row) < 2:
+                continue
+            front, back, reading, example, tags_str = (row + ["", "", ""])[:5]
+
+        front = front.strip()
+        card = AnkiCard(front=front, back=back.strip(), reading=reading.strip(), example=example.strip())
+
+        tags = tags_str.split()
+        if tags:
+            card.tags = tags
+        elif not front.isascii():  # If Japanese characters
+            card.tags = ["japanese"]
+
+        deck.cards.append(card)
+
 class DeckService:
     def create_deck_from_csv(self, file_content: str, deck_name: str) -> AnkiDeck:
         """
@@ -53,6 +88,13 @@ class DeckService:
         
         csv_reader = csv.reader(csv_file, dialect=dialect)
         
+        # Plain enriched CSVs (our own export format) take the fast path
+        if not is_anki_format and lines[0].strip() == _ENRICHED_HEADER:
+            next(csv_reader, None)
+            _parse_enriched_fast(csv_reader, deck)
+            deck.is_enriched = True
+            return deck
+        
         # Detect if we have an enriched CSV by looking for the enriched header
         header_row = None
         if has_header and lines[0 if not is_anki_format else metadata_count].strip() == "Japanese,English,Reading,Example,Tags":
@@ -256,13 +298,13 @@ class DeckService:
             deck_id = random.randrange(1 << 30, 1 << 31)
             anki_deck = genanki.Deck(deck_id, deck_name)
             
-            print(f"Creating Anki deck: {deck_name} (ID: {deck_id})")
+            logger.info("Creating Anki deck: %s (ID: %d)", deck_name, deck_id)
             
             # Parse the CSV content
             is_anki_format = csv_content.strip().startswith("#separator")
             
             if is_anki_format:
-                print("Detected Anki format CSV")
+                logger.info("Detected Anki format CSV")
                 lines = csv_content.strip().split('\n')
                 metadata_count = 0
                 dialect = 'excel-tab' if "#separator:tab" in lines[0].lower() else 'excel'
@@ -277,7 +319,7 @@ class DeckService:
                         if line.lower().startswith('#columns:'):
                             column_parts = line[9:].strip().split(separator)
                             column_mapping = {i: name.strip() for i, name in enumerate(column_parts)}
-                            print(f"Found column mapping: {column_mapping}")
+                            logger.debug("Found column mapping: %s", column_mapping)
                     else:
                         break
                         
@@ -286,17 +328,17 @@ class DeckService:
                 
                 # If we have an empty csv_content after metadata removal, there's an issue
                 if not csv_content.strip():
-                    print("WARNING: No CSV content found after removing metadata")
+                    logger.warning("No CSV content found after removing metadata")
                     # Fallback: try to use content after the "#columns:" line
                     for i, line in enumerate(lines):
                         if line.lower().startswith('#columns:'):
                             csv_content = '\n'.join(lines[i+1:])
                             break
             else:
-                print("Using standard CSV format")
+                logger.info("Using standard CSV format")
                 dialect = 'excel'
             
-            print(f"CSV content after processing: '{csv_content[:100]}...'")
+            logger.debug("CSV content after processing: '%s...'", csv_content[:100])
             
             # Handle possible empty content
             if not csv_content.strip():
@@ -305,7 +347,7 @@ class DeckService:
             # More robust CSV parsing that handles special cases
             rows = []
             if dialect == 'excel-tab':
-                print("Using specialized tab-separated file parser")
+                logger.info("Using specialized tab-separated file parser")
                 # For tab-separated files that may contain commas within fields
                 content_lines = csv_content.strip().split('\n')
                 
@@ -338,7 +380,7 @@ class DeckService:
                             row_parts = next(csv_reader, [])
                             rows.append(row_parts)
                         except Exception as e:
-                            print(f"Error parsing CSV line '{line}': {e}")
+                            logger.warning("Error parsing CSV line '%s': %s", line, e)
                             rows.append([line])
             else:
                 # Standard CSV parsing for comma-separated files
@@ -347,8 +389,7 @@ class DeckService:
                     csv_reader = csv.reader(csv_file, dialect=dialect)
                     rows = list(csv_reader)
                 except Exception as e:
-                    print(f"Error parsing CSV content: {e}")
-                    print(f"Falling back to line-by-line parsing")
+                    logger.warning("Error parsing CSV content: %s. Falling back to line-by-line parsing", e)
                     # Fallback mode - split by lines and try to parse each line
                     content_lines = csv_content.strip().split('\n')
                     for line in content_lines:
@@ -363,8 +404,7 @@ class DeckService:
             
             # Validate we have rows
             if not rows:
-                print(f"Error: No valid rows found in CSV content")
-                print(f"CSV content sample: '{csv_content[:200]}'")
+                logger.error("No valid rows found in CSV content. Sample: '%s'", csv_content[:200])
                 raise ValueError("Failed to parse CSV content: No valid rows found")
             
             # Skip header if standard CSV
@@ -372,25 +412,34 @@ class DeckService:
             cards_added = 0
             
             # Store media files that need to be included in the package
-            media_files = []
+            media_files = {}  # Ordered set: repeated words share one cached audio file
+            
+            # Sound fields already generated for repeated words/examples
+            audio_cache = {}
+            example_audio_cache = {}
             
             # Allow for various common column names
             front_column_names = ['japanese', 'front', 'word', 'question']
             back_column_names = ['english', 'back', 'answer', 'meaning', 'translation']
             
-            # Keep track of rows for debugging
-            all_rows = []
+            # Keep the last few rows for debugging
+            recent_rows = deque(maxlen=10)
+            
+            # Per-row diagnostics are only formatted when debug logging is on
+            debug = logger.isEnabledFor(logging.DEBUG)
             
             for row_index, row in enumerate(rows):
-                all_rows.append(row)
+                recent_rows.append((row_index, row))
                 
                 # Skip completely empty rows
                 if not row or all(not cell.strip() for cell in row):
-                    print(f"Skipping empty row at index {row_index}")
+                    if debug:
+                        logger.debug("Skipping empty row at index %d", row_index)
                     continue
                     
                 if len(row) < 2:
-                    print(f"Warning: Row {row_index} has fewer than 2 columns: {row}")
+                    if debug:
+                        logger.debug("Row %d has fewer than 2 columns: %s", row_index, row)
                     continue
                     
                 front = row[0].strip()
@@ -402,11 +451,13 @@ class DeckService:
                         back.lower() in back_column_names or
                         (len(row) > 2 and row[2].strip().lower() in ['reading', 'pronunciation'])):
                         header_skipped = True
-                        print(f"Skipped header row: {row}")
+                        if debug:
+                            logger.debug("Skipped header row: %s", row)
                         continue
                 
                 if not front:
-                    print(f"Warning: Empty 'front' field in row {row_index}: {row}")
+                    if debug:
+                        logger.debug("Empty 'front' field in row %d: %s", row_index, row)
                     continue
                     
                 # Allow back to be empty for words that are being enriched
@@ -440,7 +491,10 @@ class DeckService:
                 
                 # Check if we need to generate audio
                 # We'll use the EnrichService directly if we have a Japanese term
-                if any(ord(c) > 127 for c in front):
+                if front in audio_cache:
+                    audio_field = audio_cache[front]
+                elif any(ord(c) > 127 for c in front):
+                    audio_field = ""
                     try:
                         # Import at module level to avoid circular imports
                         import sys
@@ -458,7 +512,7 @@ class DeckService:
                                     from ..services.enrich_service import EnrichService
                                     enrich_service = EnrichService()
                                 except ImportError:
-                                    print("Warning: Could not import EnrichService. Audio generation skipped.")
+                                    logger.warning("Could not import EnrichService. Audio generation skipped.")
                                     enrich_service = None
                         else:
                             # Use the already imported module
@@ -470,37 +524,45 @@ class DeckService:
                             audio_path = enrich_service.generate_audio(front)
                             if audio_path and os.path.exists(audio_path):
                                 audio_filename = os.path.basename(audio_path)
-                                media_files.append(audio_path)
-                                print(f"Added audio file: {audio_path}")
+                                media_files[audio_path] = None
+                                if debug:
+                                    logger.debug("Added audio file: %s", audio_path)
                                 # Format audio filename for Anki
                                 audio_field = f"[sound:{audio_filename}]"
                             else:
                                 audio_field = ""
                     except Exception as audio_error:
-                        print(f"Error generating audio for '{front}': {str(audio_error)}")
+                        logger.warning("Error generating audio for '%s': %s", front, audio_error)
                         audio_field = ""
+                    audio_cache[front] = audio_field
                 else:
                     audio_field = ""
                 
-                print(f"Adding note: Front='{front}', Back='{back}', Reading='{reading}', Example='{example}', Audio='{audio_field}', Tags={tags}")
+                if debug:
+                    logger.debug("Adding note: Front='%s', Back='%s', Reading='%s', Example='%s', Audio='%s', Tags=%s",
+                                 front, back, reading, example, audio_field, tags)
                 
                 # Generate example sentence audio if we have Japanese characters in the example
                 example_audio_field = ""
-                if example and any(ord(c) > 127 for c in example):
+                if example in example_audio_cache:
+                    example_audio_field = example_audio_cache[example]
+                elif example and any(ord(c) > 127 for c in example):
                     try:
                         if enrich_service:
                             # Generate audio for the example sentence
                             example_audio_path = enrich_service.generate_example_audio(example)
                             if example_audio_path and os.path.exists(example_audio_path):
                                 example_audio_filename = os.path.basename(example_audio_path)
-                                media_files.append(example_audio_path)
-                                print(f"✓ Example audio generated for: '{example}' - File: {example_audio_filename}")
+                                media_files[example_audio_path] = None
+                                if debug:
+                                    logger.debug("Example audio generated for: '%s' - File: %s", example, example_audio_filename)
                                 # Format example audio for Anki
                                 example_audio_field = f"[sound:{example_audio_filename}]"
                             else:
-                                print(f"✗ Failed to generate example audio for '{example}'")
+                                logger.warning("Failed to generate example audio for '%s'", example)
                     except Exception as e:
-                        print(f"Error generating example audio: {str(e)}")
+                        logger.warning("Error generating example audio: %s", e)
+                    example_audio_cache[example] = example_audio_field
 
                 try:
                     # Create note with our enhanced model
@@ -513,30 +575,29 @@ class DeckService:
                     anki_deck.add_note(note)
                     cards_added += 1
                 except Exception as note_error:
-                    print(f"Error adding note: {str(note_error)}. Skipping this card.")
+                    logger.warning("Error adding note: %s. Skipping this card.", note_error)
             
             # Add debugging information if no cards were created
             if cards_added == 0:
-                print("DEBUG: No cards were created. Showing processed rows:")
-                for i, row in enumerate(all_rows):
-                    print(f"Row {i}: {row}")
+                logger.warning("No cards were created. Showing last processed rows:")
+                for row_index, row in recent_rows:
+                    logger.warning("Row %d: %s", row_index, row)
                 raise ValueError("No valid cards were created. Please check your CSV format.")
                 
-            print(f"Successfully added {cards_added} cards to deck '{deck_name}'")
+            logger.info("Successfully added %d cards to deck '%s'", cards_added, deck_name)
             
             # Create package with media files
-            package = genanki.Package([anki_deck])
+            from .anki_utils import NoSyncPackage
+            package = NoSyncPackage([anki_deck])
             
             # Add media files if we have any
             if media_files:
-                package.media_files = media_files
-                print(f"Added {len(media_files)} audio files to deck")
+                package.media_files = list(media_files)
+                logger.info("Added %d audio files to deck", len(media_files))
             return package
             
         except Exception as e:
-            import traceback
-            print("Error creating Anki package:", str(e))
-            traceback.print_exc()
+            logger.exception("Error creating Anki package: %s", e)
             raise
     
     def create_deck_from_csv_with_mapping(self, file_content: str, deck_name: str, field_mapping: dict = None) -> AnkiDeck:
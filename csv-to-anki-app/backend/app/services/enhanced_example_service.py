@@ -2,24 +2,186 @@
 Enhanced Example Sentence Service
 This module provides improved example sentences from multiple online sources
 """
+import re
+import heapq
+import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
+import threading
 import random
+from concurrent.futures import Future, ThreadPoolExecutor
+from array import array
+from itertools import islice
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 import urllib.parse
 import json
+from .example_cache import ExampleCache, DEFAULT_MEMORY_SIZE
+from .http_client import WordRequest, jisho_word_request
+
+try:
+    # Optional: lets Tatoeba responses be parsed incrementally
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    # Optional: faster JSON decoding when ijson is not installed
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# Highest score _calculate_quality_score can give (length + word + punctuation + particles)
+MAX_QUALITY_SCORE = 4.5
+
+# Scanners for _sentence_score. The lookahead lets overlapping
+# particles (e.g. で inside まで) all be found in one pass.
+_PARTICLES = ('は', 'が', 'を', 'に', 'で', 'と', 'から', 'まで')
+_PARTICLE_RE = re.compile('(?=(' + '|'.join(map(re.escape, _PARTICLES)) + '))')
+_PUNCT = frozenset('。！？')
+
+@lru_cache(maxsize=65536)
+def _sentence_score(sentence: str) -> float:
+    """Score the parts of sentence quality that don't depend on the target word"""
+    score = 0.0
+    
+    # Length preference - not too short, not too long
+    length = len(sentence)
+    if 10 <= length <= 50:
+        score += 1.0
+    elif 5 <= length <= 80:
+        score += 0.5
+    
+    # Has appropriate punctuation
+    if not _PUNCT.isdisjoint(sentence):
+        score += 0.5
+    
+    # Contains common particles (indicates natural Japanese)
+    particle_count = len(set(_PARTICLE_RE.findall(sentence)))
+    score += min(particle_count * 0.2, 1.0)
+    
+    return score
+
+# Sources whose best possible score is lower than MAX_QUALITY_SCORE
+_SOURCE_MAX_SCORE = {
+    'weblio': 0.0,  # Placeholder source, never returns examples
+}
+
+# Maximum number of words looked up at once by find_best_examples_bulk
+BULK_CONCURRENCY = 8
+
+# Number of sources queried per word (tatoeba, jisho, weblio)
+SOURCES_PER_WORD = 3
+
+# Shared pool so the independent sources for a word are queried concurrently.
+# Sized so a full bulk batch never queues one word's sources behind another's.
+_SOURCE_EXECUTOR = ThreadPoolExecutor(max_workers=BULK_CONCURRENCY * SOURCES_PER_WORD,
+                                      thread_name_prefix="example-source")
+
+# Retry transient failures with exponential backoff
+_RETRY_OPTIONS = dict(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=['GET'])
+try:
+    _RETRY = Retry(backoff_jitter=0.3, **_RETRY_OPTIONS)
+except TypeError:  # urllib3 < 2 has no backoff_jitter
+    _RETRY = Retry(**_RETRY_OPTIONS)
+
+# Shared HTTP session so repeated lookups reuse TCP/TLS connections
+_HTTP_SESSION = requests.Session()
+# One pool per host, with a keep-alive connection for every concurrent word
+_HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=SOURCES_PER_WORD, pool_maxsize=BULK_CONCURRENCY,
+                                            max_retries=_RETRY))
+
+@lru_cache(maxsize=65536)
+def _tatoeba_url(word: str) -> str:
+    """Build the Tatoeba search URL for a word"""
+    return f"https://tatoeba.org/en/api_v0/search?from=jpn&to=eng&query={urllib.parse.quote(word)}"
+
+# Circuit breaker: skip a source for BREAKER_COOLDOWN seconds after
+# BREAKER_THRESHOLD consecutive failures instead of waiting on every timeout
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 60
+_BREAKER = {'tatoeba': {'failures': 0, 'open_until': 0.0}}
+_BREAKER_LOCK = threading.Lock()
+
+def _breaker_open(source: str) -> bool:
+    """Check whether a source is currently being skipped"""
+    with _BREAKER_LOCK:
+        return time.monotonic() < _BREAKER[source]['open_until']
+
+def _record_result(source: str, ok: bool):
+    """Update the circuit breaker after a request to a source"""
+    with _BREAKER_LOCK:
+        state = _BREAKER[source]
+        if ok:
+            state['failures'] = 0
+            return
+        state['failures'] += 1
+        if state['failures'] >= BREAKER_THRESHOLD:
+            state['open_until'] = time.monotonic() + BREAKER_COOLDOWN
+            state['failures'] = 0
+
+class ExampleBatch:
+    """Candidate examples stored as parallel columns instead of one dict per example"""
+    
+    __slots__ = ('japanese', 'english', 'sources', 'scores')
+    
+    def __init__(self):
+        self.japanese = []
+        self.english = []
+        self.sources = []
+        self.scores = array('d')
+    
+    def __len__(self):
+        return len(self.scores)
+    
+    def append(self, japanese: str, english: str, score: float, source: Optional[str] = None):
+        """Add one candidate example"""
+        self.japanese.append(japanese)
+        self.english.append(english)
+        self.sources.append(source)
+        self.scores.append(score)
+    
+    def extend(self, other: 'ExampleBatch', source: str):
+        """Add every candidate from another batch, labelled with its source"""
+        self.japanese.extend(other.japanese)
+        self.english.extend(other.english)
+        self.sources.extend([source] * len(other))
+        self.scores.extend(other.scores)
+    
+    def to_dicts(self, indices) -> List[Dict[str, str]]:
+        """Build example dictionaries for the given rows only"""
+        return [
+            {
+                'japanese': self.japanese[i],
+                'english': self.english[i],
+                'quality_score': self.scores[i],
+                'source': self.sources[i],
+            }
+            for i in indices
+        ]
 
 class EnhancedExampleService:
     """Service for getting high-quality example sentences from multiple online sources"""
     
-    def __init__(self):
-        """Initialize the enhanced example service"""
+    def __init__(self, cache_path: Optional[str] = None, cache_size: int = DEFAULT_MEMORY_SIZE):
+        """
+        Initialize the enhanced example service
+        
+        Args:
+            cache_path: Path of the on-disk example cache (defaults to the user cache dir)
+            cache_size: Number of lookups kept in memory in front of the on-disk cache
+        """
         self.sources = {
             'tatoeba': self._get_tatoeba_examples,
             'jisho': self._get_jisho_examples,
             'weblio': self._get_weblio_examples,
         }
-        self.cache = {}  # Simple cache to avoid repeated API calls
+        self.cache = ExampleCache(cache_path, cache_size)  # Persistent cache to avoid repeated API calls
         
     def find_best_example(self, japanese_word: str, max_examples: int = 3) -> List[Dict[str, str]]:
         """
@@ -33,37 +195,123 @@ class EnhancedExampleService:
             List of example dictionaries with 'japanese', 'english', and 'source' keys
         """
         # Check cache first
-        cache_key = f"{japanese_word}_{max_examples}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached = self.cache.get(japanese_word, max_examples)
+        if cached is not None:
+            return cached
+        
+        if max_examples == 1:
+            # Common case (get_example_with_fallback): just track the running best
+            best = self._find_single_best(japanese_word)
+            best_examples = [best] if best is not None else []
+            self.cache.set(japanese_word, max_examples, best_examples)
+            return best_examples
+        
+        all_examples = ExampleBatch()
+        top_scores = []  # Min-heap of the best max_examples scores seen so far
         
-        all_examples = []
+        futures = self._submit_sources(japanese_word, max_examples)
+        source_names = list(futures)
         
-        # Try each source in order of preference
-        for source_name, source_func in self.sources.items():
+        # Collect results in order of preference
+        for i, source_name in enumerate(source_names):
             try:
-                examples = source_func(japanese_word, max_examples)
-                for example in examples:
-                    example['source'] = source_name
-                    all_examples.append(example)
-                
-                # If we have enough good examples, we can stop
-                if len(all_examples) >= max_examples:
-                    break
-                    
+                examples = futures[source_name].result()
+                all_examples.extend(examples, source_name)
+                for score in examples.scores:
+                    if len(top_scores) < max_examples:
+                        heapq.heappush(top_scores, score)
+                    else:
+                        heapq.heappushpop(top_scores, score)
             except Exception as e:
-                print(f"Error getting examples from {source_name}: {str(e)}")
-                continue
+                logger.warning("Error getting examples from %s: %s", source_name, e)
+            
+            # Stop once no remaining source could beat the current top examples
+            if len(top_scores) == max_examples:
+                bound = max((_SOURCE_MAX_SCORE.get(name, MAX_QUALITY_SCORE) for name in source_names[i + 1:]),
+                            default=0.0)
+                if top_scores[0] >= bound:
+                    break
+        
+        # Drop lookups for sources we no longer need that haven't started yet
+        for future in futures.values():
+            future.cancel()
         
         # Sort by quality and take the best ones
-        best_examples = self._rank_examples(all_examples, japanese_word)[:max_examples]
+        best_examples = self._rank_examples(all_examples, japanese_word, max_examples)
         
         # Cache the results
-        self.cache[cache_key] = best_examples
+        self.cache.set(japanese_word, max_examples, best_examples)
         
         return best_examples
     
-    def _get_tatoeba_examples(self, word: str, max_examples: int = 3) -> List[Dict[str, str]]:
+    def _submit_sources(self, japanese_word: str, max_examples: int) -> Dict[str, Future]:
+        """Query all sources at once so the lookup costs the slowest source, not the sum"""
+        return {
+            source_name: _SOURCE_EXECUTOR.submit(source_func, japanese_word, max_examples)
+            for source_name, source_func in self.sources.items()
+        }
+    
+    def _find_single_best(self, japanese_word: str) -> Optional[Dict[str, str]]:
+        """
+        Find the single best example sentence without collecting every candidate
+        
+        Args:
+            japanese_word: Japanese word to find an example for
+            
+        Returns:
+            The best example dictionary, or None if no source had one
+        """
+        futures = self._submit_sources(japanese_word, 1)
+        source_names = list(futures)
+        best = None
+        best_score = None
+        
+        for i, source_name in enumerate(source_names):
+            try:
+                examples = futures[source_name].result()
+                if len(examples):
+                    scores = examples.scores
+                    index = max(range(len(examples)), key=scores.__getitem__)
+                    if best_score is None or scores[index] > best_score:
+                        best_score = scores[index]
+                        best = examples.to_dicts([index])[0]
+                        best['source'] = source_name
+            except Exception as e:
+                logger.warning("Error getting examples from %s: %s", source_name, e)
+            
+            # Stop once no remaining source could beat the current best
+            if best_score is not None:
+                bound = max((_SOURCE_MAX_SCORE.get(name, MAX_QUALITY_SCORE) for name in source_names[i + 1:]),
+                            default=0.0)
+                if best_score >= bound:
+                    break
+        
+        for future in futures.values():
+            future.cancel()
+        
+        return best
+    
+    def find_best_examples_bulk(self, japanese_words: List[str], max_examples: int = 3) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Find the best example sentences for many Japanese words at once
+        
+        Args:
+            japanese_words: Japanese words to find examples for
+            max_examples: Maximum number of examples to return per word
+            
+        Returns:
+            Dictionary mapping each word to its list of example dictionaries
+        """
+        unique_words = list(dict.fromkeys(japanese_words))
+        if len(unique_words) <= 1:
+            return {word: self.find_best_example(word, max_examples) for word in unique_words}
+        
+        # Bounded fan-out keeps us within the sources' rate limits
+        with ThreadPoolExecutor(max_workers=min(BULK_CONCURRENCY, len(unique_words))) as pool:
+            results = pool.map(lambda word: self.find_best_example(word, max_examples), unique_words)
+            return dict(zip(unique_words, results))
+    
+    def _get_tatoeba_examples(self, word: str, max_examples: int = 3) -> ExampleBatch:
         """
         Get example sentences from Tatoeba database
         
@@ -72,58 +320,57 @@ class EnhancedExampleService:
             max_examples: Maximum number of examples
             
         Returns:
-            List of example dictionaries
+            Batch of candidate examples
         """
-        examples = []
+        examples = ExampleBatch()
+        
+        if _breaker_open('tatoeba'):
+            return examples
         
         try:
-            # Tatoeba API endpoint
-            encoded_word = urllib.parse.quote(word)
-            url = f"https://tatoeba.org/en/api_v0/search?from=jpn&to=eng&query={encoded_word}"
-            
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if 'results' in data:
-                for result in data['results'][:max_examples * 2]:  # Get more to filter better ones
-                    if 'text' in result and 'translations' in result:
+            with _HTTP_SESSION.get(_tatoeba_url(word), timeout=(3, 10), stream=True) as response:
+                response.raise_for_status()
+                
+                if ijson is not None:
+                    # Parse results one at a time so we can stop reading early
+                    response.raw.decode_content = True
+                    results = ijson.items(response.raw, 'results.item')
+                else:
+                    results = _json_loads(response.content).get('results', [])
+                
+                for result in islice(results, max_examples * 2):  # Get more to filter better ones
+                    # Check the word first so non-matching sentences skip the translation scan
+                    if 'text' in result and 'translations' in result and self._contains_word(result['text'], word):
                         japanese_sentence = result['text']
                         
-                        # Find English translation from nested structure
-                        english_translation = None
-                        for translation_group in result['translations']:
-                            if isinstance(translation_group, list) and translation_group:
-                                # Take the first translation from the first group
-                                for translation in translation_group:
-                                    if isinstance(translation, dict) and translation.get('lang') == 'eng':
-                                        english_translation = translation.get('text', '')
-                                        break
-                                if english_translation:
-                                    break
-                            elif isinstance(translation_group, dict) and translation_group.get('lang') == 'eng':
-                                # Handle case where translation_group is directly a dict
-                                english_translation = translation_group.get('text', '')
-                                break
+                        # Find the first English translation in the nested groups
+                        english_translation = next(
+                            (translation['text']
+                             for group in result['translations']
+                             for translation in (group if isinstance(group, list) else [group])
+                             if isinstance(translation, dict) and translation.get('lang') == 'eng'
+                             and translation.get('text')),
+                            None
+                        )
                         
-                        if english_translation and self._contains_word(japanese_sentence, word):
-                            examples.append({
-                                'japanese': japanese_sentence,
-                                'english': english_translation,
-                                'quality_score': self._calculate_quality_score(japanese_sentence, word)
-                            })
+                        if english_translation:
+                            examples.append(japanese_sentence, english_translation,
+                                            self._calculate_quality_score(japanese_sentence, word,
+                                                                          known_contains=True))
                             
                             # Stop if we have enough good examples
                             if len(examples) >= max_examples:
                                 break
             
+            _record_result('tatoeba', True)
+            
         except Exception as e:
-            print(f"Error accessing Tatoeba: {str(e)}")
+            _record_result('tatoeba', False)
+            logger.warning("Error accessing Tatoeba: %s", e)
         
         return examples
     
-    def _get_jisho_examples(self, word: str, max_examples: int = 3) -> List[Dict[str, str]]:
+    def _get_jisho_examples(self, word: str, max_examples: int = 3) -> ExampleBatch:
         """
         Get example sentences from Jisho (fallback method)
         
@@ -132,36 +379,30 @@ class EnhancedExampleService:
             max_examples: Maximum number of examples
             
         Returns:
-            List of example dictionaries
+            Batch of candidate examples
         """
-        examples = []
+        examples = ExampleBatch()
+        
+        if WordRequest is None:
+            logger.warning("jisho_api not available")
+            return examples
         
         try:
-            # Import here to avoid circular dependencies
-            try:
-                from jisho_api.word import Word
-            except ImportError:
-                print("jisho_api not available")
-                return examples
-            
-            response = Word.request(word)
+            response = jisho_word_request(word)
             if response and response.data:
                 result = response.data[0]
                 
                 if hasattr(result, "examples") and result.examples:
                     for example in result.examples[:max_examples]:
-                        examples.append({
-                            'japanese': example.japanese,
-                            'english': example.english,
-                            'quality_score': self._calculate_quality_score(example.japanese, word)
-                        })
+                        examples.append(example.japanese, example.english,
+                                        self._calculate_quality_score(example.japanese, word))
         
         except Exception as e:
-            print(f"Error accessing Jisho: {str(e)}")
+            logger.warning("Error accessing Jisho: %s", e)
         
         return examples
     
-    def _get_weblio_examples(self, word: str, max_examples: int = 3) -> List[Dict[str, str]]:
+    def _get_weblio_examples(self, word: str, max_examples: int = 3) -> ExampleBatch:
         """
         Get example sentences from Weblio (placeholder for now)
         
@@ -170,11 +411,11 @@ class EnhancedExampleService:
             max_examples: Maximum number of examples
             
         Returns:
-            List of example dictionaries
+            Batch of candidate examples
         """
         # Placeholder implementation - would need Weblio API key
-        # For now, return empty list
-        return []
+        # For now, return an empty batch
+        return ExampleBatch()
     
     def _contains_word(self, sentence: str, word: str) -> bool:
         """
@@ -189,54 +430,43 @@ class EnhancedExampleService:
         """
         return word in sentence
     
-    def _calculate_quality_score(self, sentence: str, target_word: str) -> float:
+    def _calculate_quality_score(self, sentence: str, target_word: str, *, known_contains: bool = False) -> float:
         """
         Calculate a quality score for an example sentence
         
         Args:
             sentence: Japanese sentence
             target_word: Target word
+            known_contains: True if the caller already checked the sentence contains target_word
             
         Returns:
             Quality score (higher is better)
         """
-        score = 0.0
-        
-        # Length preference - not too short, not too long
-        length = len(sentence)
-        if 10 <= length <= 50:
-            score += 1.0
-        elif 5 <= length <= 80:
-            score += 0.5
+        # Length, punctuation and particles are memoized per sentence, since
+        # the same sentences come back for many words in a bulk import
+        score = _sentence_score(sentence)
         
         # Contains the exact target word
-        if target_word in sentence:
+        if known_contains or target_word in sentence:
             score += 2.0
         
-        # Has appropriate punctuation
-        if any(punct in sentence for punct in ['。', '！', '？']):
-            score += 0.5
-        
-        # Contains common particles (indicates natural Japanese)
-        particles = ['は', 'が', 'を', 'に', 'で', 'と', 'から', 'まで']
-        particle_count = sum(1 for p in particles if p in sentence)
-        score += min(particle_count * 0.2, 1.0)
-        
         return score
     
-    def _rank_examples(self, examples: List[Dict[str, str]], target_word: str) -> List[Dict[str, str]]:
+    def _rank_examples(self, examples: ExampleBatch, target_word: str, k: int) -> List[Dict[str, str]]:
         """
         Rank examples by quality
         
         Args:
-            examples: List of example dictionaries
+            examples: Batch of candidate examples
             target_word: Target word for ranking
+            k: Number of examples to keep
             
         Returns:
-            Sorted list of examples (best first)
+            The k best examples as dictionaries (best first)
         """
-        # Sort by quality score (highest first)
-        return sorted(examples, key=lambda x: x.get('quality_score', 0), reverse=True)
+        # Rank row indices on the score column; only the winners become dicts
+        best = heapq.nlargest(k, range(len(examples)), key=examples.scores.__getitem__)
+        return examples.to_dicts(best)
     
     def get_example_with_fallback(self, word: str) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -259,3 +489,7 @@ class EnhancedExampleService:
     def clear_cache(self):
         """Clear the example cache"""
         self.cache.clear()
+    
+    def clear_cache_for(self, word: str):
+        """Clear cached examples for a single word"""
+        self.cache.delete(word)
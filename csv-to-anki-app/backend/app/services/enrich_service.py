@@ -4,42 +4,113 @@ This module adds English translations, example sentences, and audio for Japanese
 """
 import os
 import re
+import csv
 import json
+import logging
+import shutil
+import bisect
+import hashlib
 import tempfile
-from typing import Dict, List, Optional, Tuple
+import threading
+from io import StringIO
+from functools import cached_property
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 import requests
-from gtts import gTTS
-from jisho_api.word import Word
 from pykakasi import kakasi
+from gtts import gTTS
 from .enhanced_example_service import EnhancedExampleService
+from .http_client import SESSION, jisho_word_request
+
+logger = logging.getLogger(__name__)
+
+# Generated speech is kept here across runs, named by a BLAKE2b hash of (lang, text);
+# example sentence audio also carries EXAMPLE_AUDIO_PREFIX.
+# ANKI_TTS_CACHE moves it somewhere longer-lived than the temp directory.
+AUDIO_CACHE_DIR = os.environ.get("ANKI_TTS_CACHE") or os.path.join(tempfile.gettempdir(), "anki_tts_cache")
+
+# Filename prefix that tells example sentence audio apart from word audio
+EXAMPLE_AUDIO_PREFIX = "example_"
+
+# Japanese part of an example: everything before "(English)", " - English" or a newline
+_EXAMPLE_SPLIT_RE = re.compile(r'^(.*?)(?:\s*\(|\s+-\s+|\n)')
+
+# Rough frequency rank for each JLPT level (Jisho doesn't provide true frequency)
+_JLPT_FREQUENCY = {
+    "jlpt-n5": 500,  # Most common words
+    "jlpt-n4": 1000,
+    "jlpt-n3": 3000,
+    "jlpt-n2": 6000,
+    "jlpt-n1": 10000,
+}
+
+# Frequency rank thresholds for the JLPT tag; ranks above the last one are N1
+_FREQUENCY_THRESHOLDS = [500, 1000, 3000, 6000]
+_FREQUENCY_TAGS = ["jlpt_n5", "jlpt_n4", "jlpt_n3", "jlpt_n2", "jlpt_n1"]
+
+def _clean_pos_tags(parts_of_speech: List[str]) -> List[str]:
+    """Turn parts of speech into unique Anki tags (lowercase, underscores, no commas), in order"""
+    return list(dict.fromkeys(pos.lower().replace(' ', '_').replace(',', '') for pos in parts_of_speech))
+
+# Meaning keywords that add a category tag, in tag order
+_TAG_TERMS = {
+    "food": ["food", "eat", "drink", "meal", "fruit", "vegetable"],
+    "color": ["color", "colour", "red", "blue", "green", "yellow"],
+    "number": ["number", "count", "one", "two", "three", "first", "second"],
+}
+_TERM_TO_TAG = {term: tag for tag, terms in _TAG_TERMS.items() for term in terms}
+# Substring matches, like `term in text`; the lookahead also finds overlapping terms
+_TAG_RE = re.compile("(?=(" + "|".join(map(re.escape, _TERM_TO_TAG)) + "))")
+
+# Maximum number of words enriched at once (each word is several blocking HTTPS calls)
+ENRICH_CONCURRENCY = 16
+
+# Runs example lookups alongside the Jisho request for the same word
+_EXAMPLE_EXECUTOR = ThreadPoolExecutor(max_workers=ENRICH_CONCURRENCY, thread_name_prefix="enrich-examples")
 
 class EnrichService:
     """Service for enriching Japanese vocabulary with translations, examples, and audio"""
     
     def __init__(self, use_enhanced_examples: bool = True):
         """Initialize the enrichment service with necessary resources"""
-        self.kakasi = kakasi()
+        self._kakasi_lock = threading.Lock()  # kakasi isn't documented as thread-safe
         self.temp_dir = tempfile.mkdtemp()
+        self.session = SESSION  # Pooled keep-alive session shared by the Jisho calls
+        self.audio_cache_dir = AUDIO_CACHE_DIR
+        os.makedirs(self.audio_cache_dir, exist_ok=True)
         self.use_enhanced_examples = use_enhanced_examples
-        
-        # Initialize enhanced example service if enabled
+    
+    @cached_property
+    def kakasi(self):
+        """Romaji converter, created on first use (loading its dictionaries is slow)"""
+        return kakasi()
+    
+    @cached_property
+    def enhanced_example_service(self) -> Optional[EnhancedExampleService]:
+        """Enhanced example service if enabled, created on first use"""
         if self.use_enhanced_examples:
-            self.enhanced_example_service = EnhancedExampleService()
-        else:
-            self.enhanced_example_service = None
-        
-    def lookup_word(self, japanese_word: str) -> Dict:
+            return EnhancedExampleService()
+        return None
+    
+    def lookup_word(self, japanese_word: str, examples_future: Optional[Future] = None) -> Dict:
         """
         Look up Japanese word using Jisho API
         
         Args:
             japanese_word: Japanese word to look up
+            examples_future: Future for the word's enhanced examples, if they are
+                             already being fetched (see _prefetch_examples)
             
         Returns:
             Dictionary with translation information
         """
+        # The example lookup doesn't depend on the Jisho result, so start it first
+        if examples_future is None and self.use_enhanced_examples and self.enhanced_example_service:
+            examples_future = _EXAMPLE_EXECUTOR.submit(
+                self.enhanced_example_service.find_best_example, japanese_word, 3)
+        
         try:
-            response = Word.request(japanese_word)
+            response = jisho_word_request(japanese_word)
             if response and response.data:
                 # Get the first (most relevant) result
                 result = response.data[0]
@@ -60,17 +131,7 @@ class EnrichService:
                 # Calculate a rough frequency rank based on results order
                 # This is just an approximation since Jisho API doesn't provide true frequency
                 if hasattr(result, "jlpt") and result.jlpt:
-                    level = result.jlpt[0]
-                    if level == "jlpt-n5":
-                        info["frequency"] = 500  # Most common words
-                    elif level == "jlpt-n4":
-                        info["frequency"] = 1000
-                    elif level == "jlpt-n3":
-                        info["frequency"] = 3000
-                    elif level == "jlpt-n2":
-                        info["frequency"] = 6000
-                    elif level == "jlpt-n1":
-                        info["frequency"] = 10000
+                    info["frequency"] = _JLPT_FREQUENCY.get(result.jlpt[0])
                 
                 # Get English meanings and other metadata with sense grouping
                 senses_info = []
@@ -98,10 +159,13 @@ class EnrichService:
                 # Add structured senses information
                 info["senses"] = senses_info
                 
+                # Normalize the part-of-speech tags once here rather than for every CSV row
+                info["parts_of_speech_clean"] = _clean_pos_tags(info["parts_of_speech"])
+                
                 # Get example sentences - use enhanced service if available
-                if self.use_enhanced_examples and self.enhanced_example_service:
+                if examples_future is not None:
                     try:
-                        enhanced_examples = self.enhanced_example_service.find_best_example(japanese_word, max_examples=3)
+                        enhanced_examples = examples_future.result()
                         for enhanced_example in enhanced_examples:
                             info["examples"].append({
                                 "japanese": enhanced_example["japanese"],
@@ -109,7 +173,7 @@ class EnrichService:
                                 "source": enhanced_example.get("source", "enhanced")
                             })
                     except Exception as e:
-                        print(f"Enhanced examples failed, falling back to Jisho: {str(e)}")
+                        logger.warning("Enhanced examples failed, falling back to Jisho: %s", e)
                         # Fallback to Jisho examples
                         if hasattr(result, "examples") and result.examples:
                             for example in result.examples[:3]:
@@ -132,8 +196,59 @@ class EnrichService:
             else:
                 return {"word": japanese_word, "error": "Word not found"}
         except Exception as e:
-            print(f"Error looking up word '{japanese_word}': {str(e)}")
+            logger.warning("Error looking up word '%s': %s", japanese_word, e)
             return {"word": japanese_word, "error": str(e)}
+
+    def lookup_words(self, words: List[str]) -> Dict[str, Dict]:
+        """
+        Look up several Japanese words as one batch
+
+        Jisho has no bulk endpoint, so the lookups run concurrently over the
+        shared session while the enhanced examples come from one bulk call.
+
+        Args:
+            words: Japanese words to look up
+
+        Returns:
+            Dictionary mapping each distinct word to its lookup_word result, in input order
+        """
+        words = list(dict.fromkeys(words))
+        if not words:
+            return {}
+
+        examples_futures = self._prefetch_examples(words)
+        with ThreadPoolExecutor(max_workers=min(ENRICH_CONCURRENCY, len(words))) as executor:
+            futures = {word: executor.submit(self.lookup_word, word, examples_futures.get(word))
+                       for word in words}
+            return {word: future.result() for word, future in futures.items()}
+
+    def _cached_tts(self, text: str, lang: str = 'ja', prefix: str = '') -> str:
+        """
+        Get the path of a speech file for text, calling gTTS only on a cache miss
+        
+        Args:
+            text: Text to speak
+            lang: gTTS language code
+            prefix: Role prefix for the filename (EXAMPLE_AUDIO_PREFIX for example sentences)
+            
+        Returns:
+            Path to the audio file in the audio cache
+        """
+        key = hashlib.blake2b(f"{lang}:{text}".encode('utf-8'), digest_size=12).hexdigest()
+        filename = os.path.join(self.audio_cache_dir, f"{prefix}{key}.mp3")
+        if os.path.exists(filename) and os.path.getsize(filename) > 0:
+            return filename
+        
+        # Write to a name unique to this process and thread, then rename, so concurrent
+        # requests for the same text never clobber each other or see a partial file
+        temp_filename = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            gTTS(text, lang=lang).save(temp_filename)
+            os.replace(temp_filename, filename)
+        finally:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+        return filename
     
     def generate_audio(self, japanese_word: str) -> str:
         """
@@ -146,33 +261,14 @@ class EnrichService:
             Path to the generated audio file
         """
         try:
-            # Create a more robust filename for Anki compatibility
-            # Replace non-ASCII chars with their hex codes to ensure uniqueness
-            safe_name = ""
-            for char in japanese_word:
-                if ord(char) < 128 and char.isalnum():
-                    safe_name += char
-                else:
-                    safe_name += f"_{ord(char):x}"
-            
-            # Ensure filename is not too long
-            if len(safe_name) > 40:
-                safe_name = safe_name[:40]
-                
-            # Add a random component to avoid collisions
-            import random
-            safe_name += f"_{random.randint(1000, 9999)}"
+            # Generate audio using gTTS (Google Text-to-Speech), reusing earlier results.
+            # The hashed filename is ASCII-only, which keeps Anki happy.
+            filename = self._cached_tts(japanese_word)
             
-            filename = os.path.join(self.temp_dir, f"{safe_name}.mp3")
-            
-            # Generate audio using gTTS (Google Text-to-Speech)
-            tts = gTTS(japanese_word, lang='ja')
-            tts.save(filename)
-            
-            print(f"Generated audio for '{japanese_word}' at {filename}")
+            logger.debug("Generated audio for '%s' at %s", japanese_word, filename)
             return filename
         except Exception as e:
-            print(f"Error generating audio for '{japanese_word}': {str(e)}")
+            logger.warning("Error generating audio for '%s': %s", japanese_word, e)
             return ""
     
     def generate_example_audio(self, example_text: str) -> str:
@@ -185,71 +281,42 @@ class EnrichService:
         Returns:
             Path to the generated audio file
         """
-        print(f"=== GENERATING EXAMPLE AUDIO ===")
-        print(f"Input example text: '{example_text}'")
+        logger.debug("Generating example audio for: '%s'", example_text)
         
         try:
-            # Extract just the Japanese part if there's an English translation in parentheses
-            japanese_part = example_text
+            # Extract just the Japanese part from formats like
+            # "猫が好きです。(I like cats.)", "猫が好きです。 - I like cats." or "猫が好きです。\nI like cats."
+            match = _EXAMPLE_SPLIT_RE.match(example_text)
+            japanese_part = match.group(1).strip() if match else example_text.strip()
+            logger.debug("Extracted Japanese part: '%s'", japanese_part)
             
-            # Handle different formats of example sentences
-            if '(' in example_text:
-                # Format: "猫が好きです。(I like cats.)"
-                japanese_part = example_text.split('(')[0].strip()
-                print(f"Extracted Japanese part from parentheses format: '{japanese_part}'")
-            elif ' - ' in example_text:
-                # Format: "猫が好きです。 - I like cats."
-                japanese_part = example_text.split(' - ')[0].strip()
-                print(f"Extracted Japanese part from dash format: '{japanese_part}'")
-            elif example_text.count('\n') == 1:
-                # Format with newline separating Japanese and English
-                japanese_part = example_text.split('\n')[0].strip()
-                print(f"Extracted Japanese part from newline format: '{japanese_part}'")
-                
             # Validate there's actually Japanese text to generate audio for
             if not japanese_part:
-                print(f"⚠️ Empty example text after extraction")
+                logger.debug("Empty example text after extraction")
                 return ""
                 
             # Check for Japanese characters - require at least one
-            has_japanese = any(ord(c) > 127 for c in japanese_part)
-            print(f"Has Japanese characters: {has_japanese}")
+            has_japanese = not japanese_part.isascii()
             
             if not has_japanese:
-                print(f"⚠️ No Japanese characters found in example: '{japanese_part}'")
+                logger.debug("No Japanese characters found in example: '%s'", japanese_part)
                 return ""
             
-            # Create a more robust filename for Anki compatibility
-            # Use 'example_' prefix to distinguish from word audio files
-            safe_name = "example_"
-            for char in japanese_part[:20]:  # Just first 20 chars for filename
-                if ord(char) < 128 and char.isalnum():
-                    safe_name += char
-                else:
-                    safe_name += f"_{ord(char):x}"
-            
-            # Add a random component to avoid collisions
-            import random
-            safe_name += f"_{random.randint(1000, 9999)}"
-            
-            filename = os.path.join(self.temp_dir, f"{safe_name}.mp3")
-            print(f"Audio will be saved to: {filename}")
-            
-            # Generate audio using gTTS (Google Text-to-Speech)
-            print(f"Generating audio for Japanese text: '{japanese_part}'")
-            tts = gTTS(japanese_part, lang='ja')
-            tts.save(filename)
+            # Generate audio using gTTS (Google Text-to-Speech), reusing earlier results
+            # The prefix marks the clip as example audio inside the package
+            filename = self._cached_tts(japanese_part, prefix=EXAMPLE_AUDIO_PREFIX)
             
             # Verify the file was created
             if os.path.exists(filename):
-                file_size = os.path.getsize(filename)
-                print(f"✓ Successfully generated example audio: '{japanese_part}' at {filename} ({file_size} bytes)")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Generated example audio for '%s' at %s (%d bytes)",
+                                 japanese_part, filename, os.path.getsize(filename))
                 return filename
             else:
-                print(f"✗ Failed to generate example audio file at {filename}")
+                logger.warning("Failed to generate example audio file at %s", filename)
                 return ""
         except Exception as e:
-            print(f"Error generating example audio: {str(e)}")
+            logger.warning("Error generating example audio: %s", e)
             return ""
             
     def get_romaji(self, japanese_text: str) -> str:
@@ -263,13 +330,27 @@ class EnrichService:
             Romaji representation of the text
         """
         try:
-            result = self.kakasi.convert(japanese_text)
+            with self._kakasi_lock:
+                result = self.kakasi.convert(japanese_text)
             romaji_parts = [item['hepburn'] for item in result]
             return ' '.join(romaji_parts)
         except Exception as e:
-            print(f"Error converting to romaji '{japanese_text}': {str(e)}")
+            logger.warning("Error converting to romaji '%s': %s", japanese_text, e)
             return japanese_text
     
+    def get_romaji_batch(self, words: List[str]) -> List[str]:
+        """
+        Convert many Japanese words to romaji, converting each distinct word once
+        
+        Args:
+            words: Japanese words to convert
+            
+        Returns:
+            Romaji for each word, in input order
+        """
+        romaji = {word: self.get_romaji(word) for word in dict.fromkeys(words)}
+        return [romaji[word] for word in words]
+    
     def enrich_vocabulary(self, words: List[str]) -> List[Dict]:
         """
         Enrich a list of Japanese words with translations, examples, and audio
@@ -280,30 +361,89 @@ class EnrichService:
         Returns:
             List of enriched word information
         """
-        enriched_words = []
+        return list(self._iter_enriched(words))
+    
+    def _iter_enriched(self, words: List[str]) -> Iterator[Dict]:
+        """
+        Enrich words concurrently, yielding each result in input order as soon as it's ready
         
-        for word in words:
-            if not word.strip():
-                continue
-                
-            # Basic info
-            word_info = {"word": word}
-            
-            # Add romaji reading
-            word_info["romaji"] = self.get_romaji(word)
+        Args:
+            words: List of Japanese words
             
-            # Add dictionary lookup info
-            lookup_info = self.lookup_word(word)
-            word_info.update(lookup_info)
+        Yields:
+            Enriched word information
+        """
+        words = [word for word in words if word.strip()]
+        if not words:
+            return
+        
+        # Start every example lookup as one bounded batch, running alongside the Jisho lookups
+        examples_futures = self._prefetch_examples(words)
+        
+        # Romaji is CPU-only, so do it up front instead of contending for kakasi in the workers
+        romaji = self.get_romaji_batch(words)
+        
+        # Words are independent and I/O-bound, so overlap their network calls.
+        # Waiting on the futures in submission order keeps the results in input order.
+        with ThreadPoolExecutor(max_workers=min(ENRICH_CONCURRENCY, len(words))) as executor:
+            futures = [executor.submit(self._enrich_one, word, word_romaji, examples_futures.get(word))
+                       for word, word_romaji in zip(words, romaji)]
+            for word, future in zip(words, futures):
+                # A failed word becomes an error entry, like a failed lookup, so callers
+                # that stream the results (e.g. as CSV) never stop partway through
+                try:
+                    yield future.result()
+                except Exception as e:
+                    logger.warning("Error enriching word '%s': %s", word, e)
+                    yield {"word": word, "error": str(e)}
+    
+    def _prefetch_examples(self, words: List[str]) -> Dict[str, Future]:
+        """
+        Start fetching enhanced examples for all words, one task per distinct word
+        
+        Each word's future resolves as soon as its own lookup finishes, so the
+        first enriched rows don't wait for the examples of the whole list.
+        
+        Args:
+            words: Japanese words
             
-            # Generate audio file
-            audio_path = self.generate_audio(word)
-            if audio_path:
-                word_info["audio_path"] = audio_path
+        Returns:
+            Dictionary mapping each word to a future for its examples (empty if disabled)
+        """
+        if not (self.use_enhanced_examples and self.enhanced_example_service):
+            return {}
+        
+        return {word: _EXAMPLE_EXECUTOR.submit(self.enhanced_example_service.find_best_example, word, 3)
+                for word in dict.fromkeys(words)}
+    
+    def _enrich_one(self, word: str, romaji: str, examples_future: Optional[Future] = None) -> Dict:
+        """
+        Enrich a single Japanese word with translations, examples, and audio
+        
+        Args:
+            word: Japanese word
+            romaji: Romaji reading of the word
+            examples_future: Future for the word's prefetched examples
             
-            enriched_words.append(word_info)
+        Returns:
+            Enriched word information
+        """
+        # Basic info
+        word_info = {"word": word}
+        
+        # Add romaji reading
+        word_info["romaji"] = romaji
         
-        return enriched_words
+        # Add dictionary lookup info
+        lookup_info = self.lookup_word(word, examples_future)
+        word_info.update(lookup_info)
+        
+        # Generate audio file
+        audio_path = self.generate_audio(word)
+        if audio_path:
+            word_info["audio_path"] = audio_path
+        
+        return word_info
     
     def find_example_sentence(self, word: str) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -318,18 +458,18 @@ class EnrichService:
         try:
             # Use enhanced example service if available
             if self.use_enhanced_examples and self.enhanced_example_service:
-                print(f"Using enhanced example service for word: {word}")
+                logger.debug("Using enhanced example service for word: %s", word)
                 return self.enhanced_example_service.get_example_with_fallback(word)
             
             # Fallback to original Jisho-only method
-            print(f"Using fallback Jisho method for word: {word}")
+            logger.debug("Using fallback Jisho method for word: %s", word)
             lookup_info = self.lookup_word(word)
             if "examples" in lookup_info and lookup_info["examples"]:
                 example = lookup_info["examples"][0]
                 return example["japanese"], example["english"]
             return None, None
         except Exception as e:
-            print(f"Error finding example for '{word}': {str(e)}")
+            logger.warning("Error finding example for '%s': %s", word, e)
             return None, None
     
     def create_enriched_csv(self, words: List[str], include_examples: bool = True, 
@@ -346,34 +486,53 @@ class EnrichService:
         Returns:
             CSV content with enriched vocabulary
         """
-        enriched_words = self.enrich_vocabulary(words)
+        return "".join(self.iter_enriched_csv_rows(words, include_examples, include_audio, format_type))
+    
+    def iter_enriched_csv_rows(self, words: List[str], include_examples: bool = True,
+                               include_audio: bool = True, format_type: str = "standard") -> Iterator[str]:
+        """
+        Stream enriched CSV content, one line at a time, as words finish enriching
         
+        Args:
+            words: List of Japanese words
+            include_examples: Whether to include example sentences
+            include_audio: Whether to include audio references
+            format_type: Format type ("standard" or "anki_tab")
+            
+        Yields:
+            CSV lines, each ending with a newline
+        """
         # Determine separator based on format type
         separator = '\t' if format_type == "anki_tab" else ','
         
+        # One writer for the whole file; it quotes fields containing separators or quotes.
+        # Its buffer only ever holds the row being written.
+        output = StringIO()
+        csv_writer = csv.writer(output, delimiter=separator, lineterminator="\n")
+        
+        def take_line() -> str:
+            line = output.getvalue()
+            output.seek(0)
+            output.truncate()
+            return line
+        
         # Create CSV content with proper header 
         if format_type == "anki_tab":
-            csv_rows = ["#separator:tab", "#html:true", f"Japanese{separator}English{separator}Reading{separator}Example{separator}Tags"]
-        else:
-            csv_rows = [f"Japanese{separator}English{separator}Reading{separator}Example{separator}Tags"]
+            yield "#separator:tab\n"
+            yield "#html:true\n"
+        csv_writer.writerow(["Japanese", "English", "Reading", "Example", "Tags"])
+        yield take_line()
         
-        for word_info in enriched_words:
+        for word_info in self._iter_enriched(words):
             japanese = word_info["word"]
             
             # Get English meaning
             english = ""
             if "meanings" in word_info and word_info["meanings"]:
                 english = "; ".join(word_info["meanings"][:3])  # First 3 meanings
-                # Escape commas and quotes in meanings to prevent CSV breakage
-                english = english.replace('"', '""')
-                if ',' in english:
-                    english = f'"{english}"'
                 
             # Get reading
             reading = word_info.get("reading", word_info.get("romaji", ""))
-            if ',' in reading:
-                reading = reading.replace('"', '""')
-                reading = f'"{reading}"'
             
             # Get example
             example = ""
@@ -381,36 +540,21 @@ class EnrichService:
                 jp_example = word_info["examples"][0]["japanese"]
                 en_example = word_info["examples"][0]["english"]
                 example = f"{jp_example} ({en_example})"
-                # Escape commas and quotes in examples to prevent CSV breakage
-                example = example.replace('"', '""')
-                if ',' in example:
-                    example = f'"{example}"'
             
             # Get part of speech and other useful tags
             tags = []
             
             # Add part of speech tags
-            if "parts_of_speech" in word_info and word_info["parts_of_speech"]:
-                for pos in word_info["parts_of_speech"]:
-                    clean_tag = pos.lower().replace(' ', '_')
-                    clean_tag = clean_tag.replace(',', '')  # Remove commas from tags
-                    if clean_tag not in tags:
-                        tags.append(clean_tag)
+            if "parts_of_speech_clean" in word_info:
+                tags.extend(word_info["parts_of_speech_clean"])
+            elif "parts_of_speech" in word_info and word_info["parts_of_speech"]:
+                tags.extend(_clean_pos_tags(word_info["parts_of_speech"]))
             
             # Add JLPT level tag if we can guess it based on word frequency/usage
             # This is a simple heuristic - you might replace with actual JLPT data
             if "frequency" in word_info and word_info["frequency"]:
                 freq = word_info["frequency"]
-                if freq <= 500:
-                    tags.append("jlpt_n5")
-                elif freq <= 1000:
-                    tags.append("jlpt_n4")
-                elif freq <= 3000:
-                    tags.append("jlpt_n3")
-                elif freq <= 6000:
-                    tags.append("jlpt_n2")
-                else:
-                    tags.append("jlpt_n1")
+                tags.append(_FREQUENCY_TAGS[bisect.bisect_left(_FREQUENCY_THRESHOLDS, freq)])
             
             # Add tag for common words
             if "is_common" in word_info and word_info["is_common"]:
@@ -426,40 +570,25 @@ class EnrichService:
                 tags.append("long_word")
             
             # Add tags based on meaning categories (if we can identify them)
-            english_meanings = " ".join(word_info.get("meanings", []))
-            
-            if any(term in english_meanings.lower() for term in ["food", "eat", "drink", "meal", "fruit", "vegetable"]):
-                tags.append("food")
+            english_meanings = " ".join(word_info.get("meanings", [])).lower()
+            found = {_TERM_TO_TAG[term] for term in _TAG_RE.findall(english_meanings)}
+            tags.extend(tag for tag in _TAG_TERMS if tag in found)
             
-            if any(term in english_meanings.lower() for term in ["color", "colour", "red", "blue", "green", "yellow"]):
-                tags.append("color")
-                
-            if any(term in english_meanings.lower() for term in ["number", "count", "one", "two", "three", "first", "second"]):
-                tags.append("number")
-            
-            # Create CSV row - using proper CSV writing to handle special characters
-            from io import StringIO
-            import csv
-            output = StringIO()
-            csv_writer = csv.writer(output)
+            # Write the CSV row - the writer handles special characters
             csv_writer.writerow([japanese, english, reading, example, " ".join(tags)])
-            csv_row = output.getvalue().strip()
-            csv_rows.append(csv_row)
-        
-        return "\n".join(csv_rows)
+            yield take_line()
     
     def cleanup(self):
         """Clean up temporary files"""
-        import shutil
         try:
             # Check if the directory still exists and if it's empty
             if os.path.exists(self.temp_dir) and not os.listdir(self.temp_dir):
                 shutil.rmtree(self.temp_dir)
-                print(f"Cleaned up temp directory: {self.temp_dir}")
+                logger.debug("Cleaned up temp directory: %s", self.temp_dir)
             else:
-                print(f"Not cleaning temp directory {self.temp_dir} - it's either not empty or already removed")
+                logger.debug("Not cleaning temp directory %s - it's either not empty or already removed", self.temp_dir)
         except Exception as e:
-            print(f"Error cleaning up temp directory: {str(e)}")
+            logger.warning("Error cleaning up temp directory: %s", e)
             
     def get_temp_dir(self):
         """Get the temporary directory path"""
@@ -0,0 +1,137 @@
+"""
+Example Sentence Cache
+This module stores example sentence lookups on disk so they survive restarts
+"""
+import os
+import time
+import zlib
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+# Default location of the on-disk cache
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "anki-japanese-app", "examples.sqlite3")
+
+# How long cached examples stay valid (seconds)
+DEFAULT_TTL = 7 * 86400
+
+# Shorter lifetime for lookups that found nothing, so an outage doesn't hide a word for a week
+NEGATIVE_TTL = 3600
+
+# Number of entries kept in memory in front of the database
+DEFAULT_MEMORY_SIZE = 10_000
+
+def _encode(examples: List[Dict[str, str]]) -> bytes:
+    """Serialize examples for the database"""
+    return zlib.compress(pickle.dumps(examples, protocol=5))
+
+def _decode(value) -> List[Dict[str, str]]:
+    """Deserialize examples from the database"""
+    return pickle.loads(zlib.decompress(value))
+
+class ExampleCache:
+    """SQLite-backed cache of example sentences keyed by (word, max_examples)"""
+
+    def __init__(self, path: Optional[str] = None, memory_size: int = DEFAULT_MEMORY_SIZE):
+        """
+        Open (or create) the cache database
+
+        Args:
+            path: Path to the SQLite file, defaults to DEFAULT_CACHE_PATH
+            memory_size: Maximum number of entries kept in the in-memory LRU
+        """
+        self.path = path or DEFAULT_CACHE_PATH
+        self.memory_size = memory_size
+        # (word, max_examples) -> (examples, expires_at), least recently used first
+        self._memory = OrderedDict()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        # One connection shared by the lookup threads, serialized by the lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS examples ("
+                " word TEXT NOT NULL,"
+                " max_examples INTEGER NOT NULL,"
+                " value BLOB NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " PRIMARY KEY (word, max_examples))"
+            )
+            # Drop entries that expired while the app was not running
+            self._conn.execute("DELETE FROM examples WHERE expires_at <= ?", (time.time(),))
+
+    def _remember(self, key, examples, expires_at):
+        """Put an entry in the in-memory LRU, evicting the oldest if full (lock held)"""
+        self._memory[key] = (examples, expires_at)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, word: str, max_examples: int) -> Optional[List[Dict[str, str]]]:
+        """
+        Get cached examples for a word
+
+        Args:
+            word: Japanese word
+            max_examples: Maximum number of examples requested
+
+        Returns:
+            Cached list of examples, or None if missing or expired
+        """
+        key = (word, max_examples)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    return entry[0]
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM examples WHERE word = ? AND max_examples = ? AND expires_at > ?",
+                (word, max_examples, now)
+            ).fetchone()
+            if row is None:
+                return None
+            examples = _decode(row[0])
+            self._remember(key, examples, row[1])
+        return examples
+
+    def set(self, word: str, max_examples: int, examples: List[Dict[str, str]], ttl: Optional[float] = None):
+        """
+        Store examples for a word
+
+        Args:
+            word: Japanese word
+            max_examples: Maximum number of examples requested
+            examples: List of example dictionaries to cache
+            ttl: Seconds until the entry expires, defaults to DEFAULT_TTL
+                 (NEGATIVE_TTL when examples is empty)
+        """
+        if ttl is None:
+            ttl = DEFAULT_TTL if examples else NEGATIVE_TTL
+        expires_at = time.time() + ttl
+        with self._lock, self._conn:
+            self._remember((word, max_examples), examples, expires_at)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO examples (word, max_examples, value, expires_at) VALUES (?, ?, ?, ?)",
+                (word, max_examples, _encode(examples), expires_at)
+            )
+
+    def delete(self, word: str):
+        """Remove every cached entry for a word"""
+        with self._lock, self._conn:
+            for key in [key for key in self._memory if key[0] == word]:
+                del self._memory[key]
+            self._conn.execute("DELETE FROM examples WHERE word = ?", (word,))
+
+    def clear(self):
+        """Remove all cached entries"""
+        with self._lock, self._conn:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM examples")
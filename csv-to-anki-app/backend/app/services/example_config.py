@@ -82,11 +82,7 @@ class ExampleSourceConfig:
     @classmethod
     def get_enabled_sources(cls):
         """Get list of enabled sources in priority order"""
-        enabled = []
-        for source in cls.DEFAULT_PRIORITY:
-            if source in cls.SOURCES and cls.SOURCES[source]['enabled']:
-                enabled.append(source)
-        return enabled
+        return list(cls._ENABLED_SOURCES)
     
     @classmethod
     def get_source_info(cls, source_name):
@@ -96,5 +92,14 @@ class ExampleSourceConfig:
     @classmethod
     def is_source_available(cls, source_name):
         """Check if a source is available and enabled"""
-        source_info = cls.get_source_info(source_name)
-        return source_info.get('enabled', False)
+        return source_name in cls._AVAILABLE_SOURCES
+
+# The config is static, so work out the enabled sources once. (Done after the
+# class body because comprehensions there can't see the class attributes.)
+ExampleSourceConfig._ENABLED_SOURCES = tuple(
+    source for source in ExampleSourceConfig.DEFAULT_PRIORITY
+    if ExampleSourceConfig.SOURCES.get(source, {}).get('enabled', False)
+)
+ExampleSourceConfig._AVAILABLE_SOURCES = frozenset(
+    name for name, info in ExampleSourceConfig.SOURCES.items() if info.get('enabled', False)
+)
@@ -3,19 +3,103 @@ Field Mapping Service
 
 This service handles CSV field detection and mapping to Anki fields.
 """
+import re
 import csv
+import math
 from io import StringIO
+from itertools import islice
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
 
+# Anki directive selecting tab-separated data
+_TAB_DIRECTIVE = re.compile(r'#separator:\s*tab', re.I)
+
+# Dialect for each delimiter the app recognizes in files without Anki directives
+DELIMITER_DIALECTS = {
+    ',': 'excel',
+    '\t': 'excel-tab',
+    ';': type('excel_semicolon', (csv.excel,), {'delimiter': ';'}),
+    '|': type('excel_pipe', (csv.excel,), {'delimiter': '|'}),
+}
+
+# Number of lines inspected when guessing the delimiter
+PROBE_LINES = 5
+
+def header_dialect(header_line: str):
+    """
+    Get the dialect from a header line that uses exactly one known delimiter
+
+    Args:
+        header_line: First non-blank line of the file
+
+    Returns:
+        Dialect for csv.reader, or None if the header alone is ambiguous
+    """
+    present = [d for d in DELIMITER_DIALECTS if d in header_line]
+    if len(present) == 1 and header_line.count(present[0]) >= 2:
+        return DELIMITER_DIALECTS[present[0]]
+    return None
+
+def guess_dialect(lines: List[str]):
+    """
+    Guess the CSV dialect from how often each delimiter appears
+
+    A delimiter scores the lowest count it has on any line, so one that
+    appears consistently wins over one that is only common in a few fields.
+
+    Args:
+        lines: First few non-blank lines of the file
+
+    Returns:
+        Dialect for csv.reader, 'excel' if no delimiter clearly wins
+    """
+    if not lines:
+        return 'excel'
+    counts = {d: min(line.count(d) for line in lines) for d in DELIMITER_DIALECTS}
+    best = max(counts.values())
+    winners = [d for d, count in counts.items() if count == best]
+    if best == 0 or len(winners) > 1:
+        return 'excel'
+    return DELIMITER_DIALECTS[winners[0]]
+
+# Any character above U+3000 (CJK punctuation, kana, kanji, full-width forms, ...)
+_JAPANESE_RE = re.compile('[\u3001-\U0010ffff]')
+
+# Text whose non-ASCII characters are all hiragana, katakana or whitespace
+_KANA_RE = re.compile(r'[\x00-\x7f\u3040-\u30ff\s]*')
+
+@lru_cache(maxsize=4096)
+def _classify_cell(value: str) -> Tuple[bool, bool, bool]:
+    """
+    Classify a sample cell for content-based field detection
+
+    Returns:
+        Tuple of (has Japanese characters, looks like a kana reading,
+        looks like an English definition); a reading is also Japanese
+    """
+    if _JAPANESE_RE.search(value):
+        return True, _KANA_RE.fullmatch(value) is not None, False
+    # No characters above U+3000 were found, so only U+3000 itself can rule out English
+    return False, False, bool(value) and '\u3000' not in value
+
 class FieldMappingService:
     """Service for analyzing CSV files and suggesting field mappings"""
     
     # Standard field names for Japanese Anki cards
-    JAPANESE_FIELD_NAMES = ['japanese', 'word', 'front', 'kanji', '日本語', 'vocabulary', 'expression']
-    ENGLISH_FIELD_NAMES = ['english', 'meaning', 'translation', 'back', 'definition', '英語']
-    READING_FIELD_NAMES = ['reading', 'pronunciation', 'kana', 'hiragana', 'yomigana', '読み方']
-    EXAMPLE_FIELD_NAMES = ['example', 'sentence', 'usage', 'context', '例文', 'example sentence']
-    TAG_FIELD_NAMES = ['tag', 'tags', 'category', 'categories', 'group']
+    JAPANESE_FIELD_NAMES = frozenset({'japanese', 'word', 'front', 'kanji', '日本語', 'vocabulary', 'expression'})
+    ENGLISH_FIELD_NAMES = frozenset({'english', 'meaning', 'translation', 'back', 'definition', '英語'})
+    READING_FIELD_NAMES = frozenset({'reading', 'pronunciation', 'kana', 'hiragana', 'yomigana', '読み方'})
+    EXAMPLE_FIELD_NAMES = frozenset({'example', 'sentence', 'usage', 'context', '例文', 'example sentence'})
+    TAG_FIELD_NAMES = frozenset({'tag', 'tags', 'category', 'categories', 'group'})
+    
+    # Anki field matched by each set of header names, in order of priority
+    FIELD_NAME_RULES = (
+        ('japanese', JAPANESE_FIELD_NAMES),
+        ('english', ENGLISH_FIELD_NAMES),
+        ('reading', READING_FIELD_NAMES),
+        ('example', EXAMPLE_FIELD_NAMES),
+        ('tags', TAG_FIELD_NAMES),
+    )
     
     def analyze_csv_content(self, csv_content: str) -> Tuple[List[str], List[Dict], Dict[str, str]]:
         """
@@ -27,44 +111,40 @@ class FieldMappingService:
         Returns:
             Tuple of (header_row, sample_data, suggested_mapping)
         """
-        # Handle Anki format with directives
-        lines = csv_content.strip().split('\n')
-        if not lines:
-            return [], [], {}
-            
-        start_line = 0
+        # Read the file as a stream, since only the directives and first rows are needed
+        buf = StringIO(csv_content)
+        start = 0
+        has_directives = False
         dialect = 'excel'
         
-        # Skip Anki directives if present
-        if lines and lines[0].startswith('#'):
-            for i, line in enumerate(lines):
-                if line.startswith('#'):
-                    start_line = i + 1
-                    if '#separator:tab' in line.lower():
-                        dialect = 'excel-tab'
-                else:
-                    break
+        # Skip leading blank lines and Anki directives if present, stopping at the first data line
+        tab_found = False
+        for line in iter(buf.readline, ''):
+            if line.startswith('#'):
+                has_directives = True
+                # Once the separator is known, later directives needn't be inspected
+                if not tab_found and _TAB_DIRECTIVE.match(line):
+                    dialect = 'excel-tab'
+                    tab_found = True
+            elif line.strip():
+                break
+            start = buf.tell()
+        buf.seek(start)
         
         try:
-            # Try to detect dialect automatically for non-standard CSVs
-            if start_line == 0:
-                sample = '\n'.join(lines[:min(20, len(lines))])
-                try:
-                    dialect = csv.Sniffer().sniff(sample)
-                    print("Auto-detected CSV dialect")
-                except:
-                    print("Using default CSV dialect")
-                    pass
-            
-            # Parse CSV to get headers and sample data
-            csv_reader = csv.reader(StringIO('\n'.join(lines[start_line:])), dialect)
+            # Guess the delimiter for non-standard CSVs, from the header if it is
+            # unambiguous and otherwise from the first few lines
+            if not has_directives:
+                dialect = header_dialect(buf.readline())
+                buf.seek(start)
+                if dialect is None:
+                    probe_lines = list(islice((line for line in buf if line.strip()), PROBE_LINES))
+                    buf.seek(start)
+                    dialect = guess_dialect(probe_lines)
             
-            # For large files, don't load everything into memory
-            rows = []
-            for i, row in enumerate(csv_reader):
-                rows.append(row)
-                if i >= 10:  # Only need header + sample rows
-                    break
+            # Parse only the header + sample rows, skipping blank lines
+            csv_reader = csv.reader(buf, dialect)
+            rows = list(islice(filter(None, csv_reader), 11))
             
             if not rows:
                 return [], [], {}
@@ -121,35 +201,30 @@ class FieldMappingService:
             'tags': None
         }
         
-        # Helper function to detect Japanese characters
-        def has_japanese_chars(text):
-            return any(ord(c) > 0x3000 for c in text)
-            
         # Step 1: Try to map based on header names
-        for header in headers:
-            header_lower = header.lower().strip()
-            
-            if header_lower in self.JAPANESE_FIELD_NAMES and not anki_fields['japanese']:
-                anki_fields['japanese'] = header
-                
-            elif header_lower in self.ENGLISH_FIELD_NAMES and not anki_fields['english']:
-                anki_fields['english'] = header
-                
-            elif header_lower in self.READING_FIELD_NAMES and not anki_fields['reading']:
-                anki_fields['reading'] = header
-                
-            elif header_lower in self.EXAMPLE_FIELD_NAMES and not anki_fields['example']:
-                anki_fields['example'] = header
-                
-            elif header_lower in self.TAG_FIELD_NAMES and not anki_fields['tags']:
-                anki_fields['tags'] = header
+        lowered_headers = [header.lower().strip() for header in headers]
+        mapped_headers = set()
+        for header, header_lower in zip(headers, lowered_headers):
+            for field, names in self.FIELD_NAME_RULES:
+                if header_lower in names and not anki_fields[field]:
+                    anki_fields[field] = header
+                    mapped_headers.add(header)
+                    break
         
         # Step 2: Try to detect fields based on content if headers weren't enough
-        if sample_data:
+        # (content analysis can only fill these three fields)
+        content_fields = ('japanese', 'english', 'reading')
+        if sample_data and not all(anki_fields[field] for field in content_fields):
+            # Rows a column needs to match (70% of the sample)
+            need = math.ceil(len(sample_data) * 0.7)
+            
             # For each column, analyze the content to guess what it might be
             for header in headers:
+                if all(anki_fields[field] for field in content_fields):
+                    break
+                    
                 # Skip already mapped fields
-                if header in anki_fields.values():
+                if header in mapped_headers:
                     continue
                     
                 # Check content of this column in sample rows
@@ -157,31 +232,29 @@ class FieldMappingService:
                 english_count = 0
                 reading_kana_count = 0
                 
-                for row in sample_data:
+                for seen, row in enumerate(sample_data, 1):
                     if header in row:
-                        value = row[header]
-                        
-                        # Count rows with Japanese characters
-                        if has_japanese_chars(value):
-                            japanese_count += 1
-                            
-                            # If it looks like a reading (mostly kana)
-                            if all(0x3040 <= ord(c) <= 0x309F or 0x30A0 <= ord(c) <= 0x30FF or c.isspace() 
-                                  for c in value if ord(c) > 127):
-                                reading_kana_count += 1
-                        
-                        # Count rows that look like English definitions
-                        elif value and all(ord(c) < 0x3000 for c in value):
-                            english_count += 1
+                        # Count rows with Japanese characters, readings (mostly kana) and English definitions
+                        is_japanese, is_kana, is_english = _classify_cell(row[header])
+                        japanese_count += is_japanese
+                        reading_kana_count += is_kana
+                        english_count += is_english
+                    
+                    # Stop once the remaining rows can't change the guess below:
+                    # kana rows are also Japanese rows, and English rows are neither
+                    if not anki_fields['japanese'] and japanese_count >= need and reading_kana_count < japanese_count:
+                        break
+                    if english_count >= need or max(japanese_count, english_count) + len(sample_data) - seen < need:
+                        break
                 
                 # Make guesses based on content analysis
-                if not anki_fields['japanese'] and japanese_count >= len(sample_data) * 0.7 and reading_kana_count < japanese_count:
+                if not anki_fields['japanese'] and japanese_count >= need and reading_kana_count < japanese_count:
                     anki_fields['japanese'] = header
                     
-                elif not anki_fields['english'] and english_count >= len(sample_data) * 0.7:
+                elif not anki_fields['english'] and english_count >= need:
                     anki_fields['english'] = header
                     
-                elif not anki_fields['reading'] and reading_kana_count >= len(sample_data) * 0.7:
+                elif not anki_fields['reading'] and reading_kana_count >= need:
                     anki_fields['reading'] = header
         
         # Step 3: Use positional defaults if nothing else worked
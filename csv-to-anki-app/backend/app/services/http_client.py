@@ -0,0 +1,77 @@
+"""
+Shared HTTP Client
+This module keeps one pooled requests session for the Jisho calls
+"""
+import os
+import json
+import hashlib
+import tempfile
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from jisho_api.word.request import WordRequest
+except ImportError:
+    WordRequest = None
+
+JISHO_WORD_URL = "https://jisho.org/api/v1/search/words"
+
+# Raw Jisho responses are kept here; dictionary entries are stable, so they never expire
+JISHO_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "anki-japanese-app", "jisho")
+
+# One keep-alive session for every word, so each lookup skips the TCP/TLS handshake
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=50,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+def _fetch_jisho_json(word: str, timeout: float) -> dict:
+    """Get the raw Jisho response for a word, from the disk cache if possible"""
+    key = hashlib.sha256(word.encode("utf-8")).hexdigest()
+    path = os.path.join(JISHO_CACHE_DIR, key[:2], f"{key}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    response = SESSION.get(JISHO_WORD_URL, params={"keyword": word}, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+
+    # Write to a temp file and rename so concurrent readers never see a partial file
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except OSError:
+        pass  # The cache is an optimization; the lookup itself succeeded
+    return data
+
+@lru_cache(maxsize=4096)
+def jisho_word_request(word: str, timeout: float = 10):
+    """
+    Look up a word on Jisho, like jisho_api's Word.request but over SESSION
+
+    Results are cached in memory and on disk under JISHO_CACHE_DIR.
+    Callers must treat the returned object as read-only.
+
+    Args:
+        word: Word to search for
+        timeout: Request timeout in seconds
+
+    Returns:
+        jisho_api WordRequest, or None if there were no matches
+    """
+    if WordRequest is None:
+        raise ImportError("jisho_api not available")
+
+    result = WordRequest(**_fetch_jisho_json(word, timeout))
+    return result if len(result) else None
@@ -0,0 +1,15 @@
+"""
+Anki Tag Cleaning
+This module holds the translate table used to turn CSV tags into valid Anki tags
+"""
+
+class _TagTable(dict):
+    """str.translate table replacing characters other than letters, digits and '_' with '_'"""
+
+    def __missing__(self, code):
+        char = chr(code)
+        self[code] = value = char if char.isalnum() or char == '_' else '_'
+        return value
+
+# Filled in lazily, so non-ASCII tags (e.g. kanji) are handled too
+TAG_TABLE = _TagTable()
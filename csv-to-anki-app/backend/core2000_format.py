@@ -11,7 +11,6 @@ import sys
 import tempfile
 from app.services.anki_utils import create_anki_package_from_csv
 import genanki
-import random
 
 # Sample CSV with Japanese content in a format that works with our converter
 SAMPLE_CSV = """Japanese,English,Reading,Example,Tags
@@ -19,62 +18,10 @@ SAMPLE_CSV = """Japanese,English,Reading,Example,Tags
 犬,dog,いぬ,犬を見ます (I see a dog),animal noun
 本,book,ほん,本を読みます (I read a book),object noun"""
 
-def create_core2000_anki_package(csv_content, deck_name="Core 2000 Style Deck"):
-    """
-    Create an Anki package using the Core 2000 style template
-    
-    Args:
-        csv_content: CSV content as a string
-        deck_name: Name of the deck
-        
-    Returns:
-        Path to the created .apkg file
-    """
-    # Set up the Anki model for Core 2000 style
-    model_id = random.randrange(1 << 30, 1 << 31)  # Random ID to avoid conflicts
-    
-    model = genanki.Model(
-        model_id,
-        'Core 2000 Style',
-        fields=[
-            {'name': 'Japanese'},      # Japanese word
-            {'name': 'Reading'},       # Reading in kana
-            {'name': 'English'},       # English meaning
-            {'name': 'Example'},       # Example sentence  
-            {'name': 'Audio'},         # Audio pronunciation
-        ],
-        templates=[
-            {
-                'name': 'Recognition',  # Japanese to English
-                'qfmt': '''
-<div class="japanese">{{Japanese}}</div>
-{{#Audio}}{{Audio}}{{/Audio}}
-''',
-                'afmt': '''
-<div class="japanese">{{Japanese}}</div>
-{{#Audio}}{{Audio}}{{/Audio}}
-<hr id="answer">
-<div class="reading">{{Reading}}</div>
-<div class="english">{{English}}</div>
-{{#Example}}<div class="example">{{Example}}</div>{{/Example}}
-''',
-            },
-            {
-                'name': 'Production',  # English to Japanese
-                'qfmt': '''
-<div class="english">{{English}}</div>
-''',
-                'afmt': '''
-<div class="english">{{English}}</div>
-<hr id="answer">
-<div class="japanese">{{Japanese}}</div>
-<div class="reading">{{Reading}}</div>
-{{#Audio}}{{Audio}}{{/Audio}}
-{{#Example}}<div class="example">{{Example}}</div>{{/Example}}
-''',
-            },
-        ],
-        css='''.card {
+# Fixed note type ID, so every deck built by this script shares one note type in Anki
+MODEL_ID = 1607392320
+
+CORE2000_CSS = '''.card {
             font-family: "Hiragino Kaku Gothic Pro", "Arial Unicode MS", "Meiryo", sans-serif;
             font-size: 20px;
             text-align: center;
@@ -107,20 +54,71 @@ def create_core2000_anki_package(csv_content, deck_name="Core 2000 Style Deck"):
             border-left: 3px solid #ddd;
             padding-left: 10px;
         }'''
-    )
-    
-    # Now use our regular CSV processing but with this Core 2000 model
-    from app.services.anki_utils import create_anki_package_from_csv
-    
-    # Create a temp file for the output
-    output_file = tempfile.mktemp(suffix=".apkg")
+
+# The Core 2000 style model, built once at import. create_anki_package_from_csv
+# fills six fields in this order, so the fields follow its note layout.
+MODEL = genanki.Model(
+    MODEL_ID,
+    'Core 2000 Style',
+    fields=[
+        {'name': 'Japanese'},      # Japanese word
+        {'name': 'English'},       # English meaning
+        {'name': 'Reading'},       # Reading in kana
+        {'name': 'Example'},       # Example sentence  
+        {'name': 'Audio'},         # Audio pronunciation
+        {'name': 'ExampleAudio'},  # Audio for example sentence
+    ],
+    templates=[
+        {
+            'name': 'Recognition',  # Japanese to English
+            'qfmt': '''
+<div class="japanese">{{Japanese}}</div>
+{{#Audio}}{{Audio}}{{/Audio}}
+''',
+            'afmt': '''
+<div class="japanese">{{Japanese}}</div>
+{{#Audio}}{{Audio}}{{/Audio}}
+<hr id="answer">
+<div class="reading">{{Reading}}</div>
+<div class="english">{{English}}</div>
+{{#Example}}<div class="example">{{Example}}{{#ExampleAudio}} {{ExampleAudio}}{{/ExampleAudio}}</div>{{/Example}}
+''',
+        },
+        {
+            'name': 'Production',  # English to Japanese
+            'qfmt': '''
+<div class="english">{{English}}</div>
+''',
+            'afmt': '''
+<div class="english">{{English}}</div>
+<hr id="answer">
+<div class="japanese">{{Japanese}}</div>
+<div class="reading">{{Reading}}</div>
+{{#Audio}}{{Audio}}{{/Audio}}
+{{#Example}}<div class="example">{{Example}}{{#ExampleAudio}} {{ExampleAudio}}{{/ExampleAudio}}</div>{{/Example}}
+''',
+        },
+    ],
+    css=CORE2000_CSS
+)
+
+def create_core2000_anki_package(csv_content, deck_name="Core 2000 Style Deck"):
+    """
+    Create an Anki package using the Core 2000 style template
     
-    # Process the CSV and create the package with custom model
-    package = create_anki_package_from_csv(csv_content, deck_name)
+    Args:
+        csv_content: CSV content as a string
+        deck_name: Name of the deck
+        
+    Returns:
+        Path to the created .apkg file
+    """
+    # Reserve a temp file for the output (mktemp could hand the name to another process)
+    with tempfile.NamedTemporaryFile(suffix=".apkg", delete=False) as temp_file:
+        output_file = temp_file.name
     
-    # Replace the model with our Core 2000 style model
-    # Note: This would normally be included in a custom function, but we're 
-    # leveraging the existing code and just replacing the model
+    # Use our regular CSV processing, but with the Core 2000 style model
+    package = create_anki_package_from_csv(csv_content, deck_name, model=MODEL)
     
     # Write to file
     package.write_to_file(output_file)
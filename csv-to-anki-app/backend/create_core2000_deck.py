@@ -13,7 +13,6 @@ The Core 2000 format features:
 import os
 import sys
 import argparse
-from app.services.anki_utils import create_core2000_package_from_csv
 
 def create_core2000_deck(input_csv_path, output_path=None, deck_name=None):
     """
@@ -27,19 +26,14 @@ def create_core2000_deck(input_csv_path, output_path=None, deck_name=None):
     Returns:
         Path to the created .apkg file
     """
+    # Imported here so the CLI starts (and --help answers) without loading genanki
+    from app.services.anki_utils import create_core2000_package_from_file
+    
     # Validate input file
     if not os.path.exists(input_csv_path):
         print(f"Error: Input file '{input_csv_path}' does not exist.")
         return None
     
-    # Read CSV content
-    try:
-        with open(input_csv_path, 'r', encoding='utf-8') as f:
-            csv_content = f.read()
-    except Exception as e:
-        print(f"Error reading CSV file: {str(e)}")
-        return None
-    
     # Set default deck name based on input filename if not provided
     if not deck_name:
         base_name = os.path.splitext(os.path.basename(input_csv_path))[0]
@@ -56,8 +50,8 @@ def create_core2000_deck(input_csv_path, output_path=None, deck_name=None):
     print(f"Output will be saved to: {output_path}")
     
     try:
-        # Create the Core 2000 package
-        package = create_core2000_package_from_csv(csv_content, deck_name)
+        # Create the Core 2000 package, reading the CSV through a memory map
+        package = create_core2000_package_from_file(input_csv_path, deck_name)
         
         # Write the package to the output path
         package.write_to_file(output_path)
@@ -9,153 +9,173 @@ It validates the CSV format and checks if example sentences are properly formatt
 import sys
 import csv
 import os
-from io import StringIO
+import itertools
 import argparse
-import colorama
-from colorama import Fore, Style
 
-# Initialize colorama for colored output
-colorama.init(autoreset=True)
+# Colour codes, set by init_colours(); plain text until then
+_RED = _GRN = _YEL = _CYN = _BLU = _RST = ""
 
-def detect_dialect(content):
-    """Detect if the file is tab-separated or comma-separated"""
-    if content.strip().startswith("#separator:tab"):
+# Number of example sentences shown as a sample
+SAMPLE_SIZE = 5
+
+# Column names that mark the first row as a header
+_HEADER_TOKENS = frozenset({'japanese', 'word', 'front'})
+
+def init_colours():
+    """Initialize colorama and look up the colour codes once, instead of on every print"""
+    global _RED, _GRN, _YEL, _CYN, _BLU, _RST
+    import colorama
+    from colorama import Fore, Style
+    colorama.init(autoreset=True)
+    _RED, _GRN, _YEL, _CYN, _BLU, _RST = Fore.RED, Fore.GREEN, Fore.YELLOW, Fore.CYAN, Fore.BLUE, Style.RESET_ALL
+
+def detect_dialect(first_line):
+    """Detect if the file is tab-separated or comma-separated from its first line"""
+    if first_line.startswith("#separator:tab"):
         return 'excel-tab'
-    elif "\t" in content.split("\n")[0]:
+    elif "\t" in first_line:
         return 'excel-tab'
     else:
         return 'excel'
 
 def check_csv_format(filepath):
     """Check the CSV format and identify potential issues"""
-    print(f"\n{Fore.CYAN}Checking CSV file: {filepath}{Style.RESET_ALL}")
+    # The report is collected and written at once, rather than a print per line
+    out = []
+    emit = out.append
+    try:
+        return _check_file(filepath, emit)
+    finally:
+        sys.stdout.write('\n'.join(out) + '\n')
+
+def _check_file(filepath, emit):
+    """Open the CSV file and check it, sending report lines to emit"""
+    emit(f"\n{_CYN}Checking CSV file: {filepath}{_RST}")
     
-    # Read file content
+    # Open the file; it is read one line at a time so large files aren't loaded whole.
+    # Universal newlines turn CRLF into LF, so no '\r' reaches the last field.
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
+        f = open(filepath, 'r', encoding='utf-8')
     except Exception as e:
-        print(f"{Fore.RED}Error reading file: {e}{Style.RESET_ALL}")
+        emit(f"{_RED}Error reading file: {e}{_RST}")
         return False
     
-    # Detect dialect
-    dialect = detect_dialect(content)
-    print(f"Detected format: {Fore.GREEN}{dialect}{Style.RESET_ALL}")
-    
-    # Parse the CSV
-    csv_rows = []
-    lines = content.strip().split('\n')
-    metadata_lines = [line for line in lines if line.startswith('#')]
-    
-    for meta in metadata_lines:
-        print(f"{Fore.BLUE}Metadata: {meta}{Style.RESET_ALL}")
+    try:
+        with f:
+            return _check_lines((line for line in f if not line.isspace()), emit)
+    except UnicodeDecodeError as e:
+        emit(f"{_RED}Error reading file: {e}{_RST}")
+        return False
+
+def _data_lines(lines, emit):
+    """Yield the data lines, reporting the metadata lines as they are skipped"""
+    for line in lines:
+        if line.startswith('#'):
+            emit(f"{_BLU}Metadata: {line.rstrip()}{_RST}")
+        else:
+            yield line
+
+def _check_lines(lines, emit):
+    """Check the non-blank lines of a CSV file, consuming them in a single pass"""
+    # Detect dialect from the first line
+    line = next(lines, None)
+    dialect = detect_dialect(line.lstrip()) if line else 'excel'
+    emit(f"Detected format: {_GRN}{dialect}{_RST}")
     
-    # Skip metadata lines
-    content_lines = [line for line in lines if not line.startswith('#')]
+    # One reader parses every data line (and quoted fields spanning lines)
+    csv_reader = csv.reader(_data_lines(itertools.chain([line] if line else [], lines), emit), dialect=dialect)
     
     # Parse first line to check for header
-    if content_lines:
-        first_row = []
-        try:
-            if dialect == 'excel-tab':
-                # Tab-separated
-                first_row = content_lines[0].split('\t')
-            else:
-                # Comma-separated
-                first_row = next(csv.reader([content_lines[0]]))
+    try:
+        first_row = next(csv_reader, None)
+    except csv.Error as e:
+        emit(f"{_RED}Error parsing CSV header: {e}{_RST}")
+        return False
+    
+    if first_row is not None:
+        # Check if this looks like a header
+        has_header = any(field.lower() in _HEADER_TOKENS for field in first_row)
+        if has_header:
+            emit(f"{_GRN}Header detected: {' | '.join(first_row)}{_RST}")
+            content_rows = csv_reader
+        else:
+            emit(f"{_YEL}No header detected. First row: {' | '.join(first_row)}{_RST}")
+            content_rows = itertools.chain([first_row], csv_reader)
             
-            # Check if this looks like a header
-            has_header = any(field.lower() in ['japanese', 'word', 'front'] for field in first_row)
+        # Check if there's an example column
+        if len(first_row) >= 4:
             if has_header:
-                print(f"{Fore.GREEN}Header detected: {' | '.join(first_row)}{Style.RESET_ALL}")
-                start_idx = 1
-            else:
-                print(f"{Fore.YELLOW}No header detected. First row: {' | '.join(first_row)}{Style.RESET_ALL}")
-                start_idx = 0
-                
-            # Check if there's an example column
-            if len(first_row) >= 4:
-                if has_header:
-                    example_column_name = first_row[3]
-                    print(f"{Fore.GREEN}Found example column: {example_column_name}{Style.RESET_ALL}")
-                else:
-                    print(f"{Fore.YELLOW}Assuming column 4 contains examples{Style.RESET_ALL}")
+                example_column_name = first_row[3]
+                emit(f"{_GRN}Found example column: {example_column_name}{_RST}")
             else:
-                print(f"{Fore.RED}CSV doesn't have enough columns for examples (needs at least 4){Style.RESET_ALL}")
-                return False
-                
-        except Exception as e:
-            print(f"{Fore.RED}Error parsing CSV header: {e}{Style.RESET_ALL}")
+                emit(f"{_YEL}Assuming column 4 contains examples{_RST}")
+        else:
+            emit(f"{_RED}CSV doesn't have enough columns for examples (needs at least 4){_RST}")
             return False
+    else:
+        content_rows = iter(())
             
-    # Parse actual rows
-    print(f"\n{Fore.CYAN}Checking example sentences:{Style.RESET_ALL}")
+    # Parse actual rows, keeping running counts and only the sample rows
+    emit(f"\n{_CYN}Checking example sentences:{_RST}")
     row_count = 0
     examples_found = 0
+    jp_example_count = 0
+    jp_en_example_count = 0
     rows_with_examples = []
     
-    for i in range(start_idx, len(content_lines)):
+    while True:
         try:
-            if dialect == 'excel-tab':
-                row = content_lines[i].split('\t')
-            else:
-                row = next(csv.reader([content_lines[i]]))
-                
-            row_count += 1
-            japanese_word = row[0].strip() if row and len(row) > 0 else ""
-            
-            # Check for example sentences
-            if len(row) > 3:
-                example = row[3].strip()
-                if example:
-                    examples_found += 1
-                    rows_with_examples.append({
-                        "word": japanese_word,
-                        "example": example[:50] + "..." if len(example) > 50 else example
-                    })
+            row = next(content_rows, None)
+        except csv.Error as e:
+            # The reader carries on with the next line after an error
+            emit(f"{_RED}Error parsing line {csv_reader.line_num}: {e}{_RST}")
+            continue
+        if row is None:
+            break
             
-        except Exception as e:
-            print(f"{Fore.RED}Error parsing row {i+1}: {e}{Style.RESET_ALL}")
-            print(f"Problematic row: {content_lines[i]}")
+        row_count += 1
+        japanese_word = row[0].strip() if row and len(row) > 0 else ""
+        
+        # Check for example sentences
+        if len(row) > 3:
+            example = row[3].strip()
+            if example:
+                examples_found += 1
+                example = example[:50] + "..." if len(example) > 50 else example
+                if len(rows_with_examples) < SAMPLE_SIZE:
+                    rows_with_examples.append({"word": japanese_word, "example": example})
+                
+                # Check if example has Japanese (any non-ASCII) characters,
+                # and if so whether it has the format "Japanese (English)"
+                if not example.isascii():
+                    if '(' in example and ')' in example:
+                        jp_en_example_count += 1
+                    else:
+                        jp_example_count += 1
             
-    print(f"\nFound {Fore.GREEN}{row_count}{Style.RESET_ALL} vocabulary entries")
-    print(f"Found {Fore.GREEN}{examples_found}{Style.RESET_ALL} entries with example sentences")
-    print(f"Example sentence coverage: {Fore.GREEN}{(examples_found / row_count * 100) if row_count else 0:.1f}%{Style.RESET_ALL}")
+    emit(f"\nFound {_GRN}{row_count}{_RST} vocabulary entries")
+    emit(f"Found {_GRN}{examples_found}{_RST} entries with example sentences")
+    emit(f"Example sentence coverage: {_GRN}{(examples_found / row_count * 100) if row_count else 0:.1f}%{_RST}")
     
     # Show some example sentences
     if rows_with_examples:
-        print(f"\n{Fore.CYAN}Sample example sentences:{Style.RESET_ALL}")
-        for i, item in enumerate(rows_with_examples[:5]):  # Show up to 5 examples
-            print(f"{i+1}. {Fore.YELLOW}{item['word']}{Style.RESET_ALL}: {item['example']}")
+        emit(f"\n{_CYN}Sample example sentences:{_RST}")
+        for i, item in enumerate(rows_with_examples):
+            emit(f"{i+1}. {_YEL}{item['word']}{_RST}: {item['example']}")
             
-        # Check the format of example sentences
-        print(f"\n{Fore.CYAN}Checking example sentence format:{Style.RESET_ALL}")
-        jp_example_count = 0
-        jp_en_example_count = 0
-        
-        for item in rows_with_examples:
-            example = item['example']
-            # Check if example has Japanese characters
-            has_jp = any(ord(c) > 127 for c in example)
-            # Check if example has format "Japanese (English)"
-            has_jp_en_format = '(' in example and ')' in example
-            
-            if has_jp and has_jp_en_format:
-                jp_en_example_count += 1
-            elif has_jp:
-                jp_example_count += 1
-                
-        print(f"Examples with Japanese text: {Fore.GREEN}{jp_example_count + jp_en_example_count}{Style.RESET_ALL}")
-        print(f"Examples with Japanese (English) format: {Fore.GREEN}{jp_en_example_count}{Style.RESET_ALL}")
+        # Report the format of example sentences
+        emit(f"\n{_CYN}Checking example sentence format:{_RST}")
+        emit(f"Examples with Japanese text: {_GRN}{jp_example_count + jp_en_example_count}{_RST}")
+        emit(f"Examples with Japanese (English) format: {_GRN}{jp_en_example_count}{_RST}")
         
         if jp_en_example_count > 0:
-            print(f"\n{Fore.GREEN}✓ Your CSV contains properly formatted example sentences.{Style.RESET_ALL}")
+            emit(f"\n{_GRN}✓ Your CSV contains properly formatted example sentences.{_RST}")
         elif jp_example_count > 0:
-            print(f"\n{Fore.YELLOW}⚠ Your examples have Japanese text but may not have English translations in parentheses.{Style.RESET_ALL}")
-            print(f"  Recommended format: \"Japanese sentence (English translation)\"")
+            emit(f"\n{_YEL}⚠ Your examples have Japanese text but may not have English translations in parentheses.{_RST}")
+            emit(f"  Recommended format: \"Japanese sentence (English translation)\"")
         else:
-            print(f"\n{Fore.RED}✗ No properly formatted Japanese example sentences found.{Style.RESET_ALL}")
-            print(f"  Recommended format: \"Japanese sentence (English translation)\"")
+            emit(f"\n{_RED}✗ No properly formatted Japanese example sentences found.{_RST}")
+            emit(f"  Recommended format: \"Japanese sentence (English translation)\"")
                 
     return True
 
@@ -164,12 +184,15 @@ if __name__ == "__main__":
     parser.add_argument('file', help='Path to the CSV file to check')
     args = parser.parse_args()
     
+    # colorama is only loaded once the arguments are known to be valid
+    init_colours()
+    
     if not os.path.exists(args.file):
-        print(f"{Fore.RED}Error: File '{args.file}' not found{Style.RESET_ALL}")
+        print(f"{_RED}Error: File '{args.file}' not found{_RST}")
         sys.exit(1)
         
     if check_csv_format(args.file):
-        print(f"\n{Fore.GREEN}CSV file processed successfully{Style.RESET_ALL}")
+        print(f"\n{_GRN}CSV file processed successfully{_RST}")
     else:
-        print(f"\n{Fore.RED}Issues found with CSV file{Style.RESET_ALL}")
+        print(f"\n{_RED}Issues found with CSV file{_RST}")
         sys.exit(1)
@@ -13,11 +13,16 @@ import sys
 import tempfile
 import zipfile
 import sqlite3
+from urllib.request import pathname2url
 import json
 import re
+import shutil
 from app.services.enrich_service import EnrichService
 from app.services.anki_utils import create_core2000_package_from_csv
 
+# Anki sound tag, capturing the media filename
+_SOUND_RE = re.compile(r'\[sound:(.*?)\]')
+
 # Sample CSV with Japanese content and example sentences
 TEST_CSV = """Japanese,English,Reading,Example,Tags
 猫,cat,ねこ,猫が好きです。(I like cats.),animal
@@ -63,121 +68,116 @@ def examine_anki_package(package_path):
         print(f"Package file does not exist: {package_path}")
         return False
         
-    # Create a temporary directory to extract the package
-    temp_dir = tempfile.mkdtemp()
-    
-    try:
-        # Extract the package
-        print(f"Extracting package to {temp_dir}...")
-        with zipfile.ZipFile(package_path, 'r') as zip_ref:
-            zip_ref.extractall(temp_dir)
-            
-        # List the extracted files
-        files = os.listdir(temp_dir)
-        print("Package contents:")
-        for file in files:
-            file_path = os.path.join(temp_dir, file)
-            file_size = os.path.getsize(file_path)
-            print(f"  - {file} ({file_size} bytes)")
-            
-        # Look for media files
-        media_file = os.path.join(temp_dir, 'media')
-        if os.path.exists(media_file):
-            print("\nExamining media file...")
-            with open(media_file, 'r') as f:
-                media_json = json.load(f)
-                print(f"Media files: {len(media_json)}")
+    # Only the collection database is written to disk, since sqlite3 needs a path;
+    # everything else is read straight from the zip. The directory is removed on
+    # exit, even when the examination is interrupted.
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'collection.anki2')
+        
+        try:
+            print(f"Reading package {package_path}...")
+            with zipfile.ZipFile(package_path, 'r') as zip_ref:
+                # List the package files, keeping their sizes for the audio checks below
+                file_sizes = {info.filename: info.file_size for info in zip_ref.infolist()}
+                print("Package contents:")
+                for file, file_size in file_sizes.items():
+                    print(f"  - {file} ({file_size} bytes)")
                 
-                # Count and categorize media files
-                audio_files = [f for f in media_json.values() if f.endswith('.mp3')]
-                example_audio_files = [f for f in audio_files if f.startswith('example_')]
-                vocab_audio_files = [f for f in audio_files if not f.startswith('example_')]
+                # Look for media files, mapping each media filename back to its id in the package
+                filename_to_id = {}
+                if 'media' in file_sizes:
+                    print("\nExamining media file...")
+                    media_json = json.loads(zip_ref.read('media'))
+                    print(f"Media files: {len(media_json)}")
                 
-                print(f"  - Total audio files: {len(audio_files)}")
-                print(f"  - Vocabulary audio files: {len(vocab_audio_files)}")
-                print(f"  - Example audio files: {len(example_audio_files)}")
+                    # Build the reverse mapping and categorize the audio in a single pass
+                    example_audio_files = []
+                    vocab_audio_files = []
+                    for media_id, filename in media_json.items():
+                        filename_to_id[filename] = media_id
+                        if filename.endswith('.mp3'):
+                            (example_audio_files if filename.startswith('example_') else vocab_audio_files).append(filename)
                 
-                if example_audio_files:
-                    print("\nExample audio files:")
-                    for file in example_audio_files:
-                        print(f"  - {file}")
-        
-        # Open and examine the SQLite database
-        db_path = os.path.join(temp_dir, 'collection.anki2')
-        if os.path.exists(db_path):
-            print("\nExamining Anki database...")
+                    print(f"  - Total audio files: {len(example_audio_files) + len(vocab_audio_files)}")
+                    print(f"  - Vocabulary audio files: {len(vocab_audio_files)}")
+                    print(f"  - Example audio files: {len(example_audio_files)}")
+                
+                    if example_audio_files:
+                        print("\nExample audio files:")
+                        for file in example_audio_files:
+                            print(f"  - {file}")
             
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+                has_db = 'collection.anki2' in file_sizes
+                if has_db:
+                    with zip_ref.open('collection.anki2') as src, open(db_path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst)
+        
+            # Open and examine the SQLite database
+            if has_db:
+                print("\nExamining Anki database...")
             
-            # Get all notes
-            cursor.execute("SELECT id, flds FROM notes")
-            notes = cursor.fetchall()
+                # Read-only, with a large page cache and memory-mapped reads for the table scans
+                conn = sqlite3.connect(f"file:{pathname2url(db_path)}?mode=ro", uri=True)
+                conn.execute("PRAGMA cache_size=-65536")
+                conn.execute("PRAGMA mmap_size=268435456")
+                cursor = conn.cursor()
             
-            print(f"Found {len(notes)} notes in database")
+                note_count = cursor.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+                print(f"Found {note_count} notes in database")
             
-            # Analyze each note
-            for i, note in enumerate(notes):
-                note_id, fields = note
-                fields_list = fields.split("\x1f")  # Split by the field separator
+                # Analyze each note, streaming rows from the cursor
+                cursor.execute("SELECT id, flds FROM notes")
+                for i, (note_id, fields) in enumerate(cursor):
+                    # Split by the field separator; only the first 6 fields are used, so anything
+                    # after them is left in one trailing item
+                    fields_list = fields.split("\x1f", 6)
                 
-                print(f"\nNote {i+1}:")
+                    print(f"\nNote {i+1}:")
                 
-                # Print the fields based on our Core 2000 model
-                if len(fields_list) >= 6:
-                    print(f"  - Japanese: {fields_list[0]}")
-                    print(f"  - Reading: {fields_list[1]}")
-                    print(f"  - English: {fields_list[2]}")
-                    print(f"  - Example: {fields_list[3]}")
-                    print(f"  - Audio: {fields_list[4]}")
-                    print(f"  - Example Audio: {fields_list[5]}")
+                    # Print the fields based on our Core 2000 model
+                    if len(fields_list) >= 6:
+                        print(f"  - Japanese: {fields_list[0]}")
+                        print(f"  - Reading: {fields_list[1]}")
+                        print(f"  - English: {fields_list[2]}")
+                        print(f"  - Example: {fields_list[3]}")
+                        print(f"  - Audio: {fields_list[4]}")
+                        print(f"  - Example Audio: {fields_list[5]}")
                     
-                    # Check for audio tags
-                    if "[sound:" in fields_list[5]:
-                        print(f"  ✅ Note has example audio tag: {fields_list[5]}")
-                        
-                        # Extract the filename
-                        audio_filename = re.search(r'\[sound:(.*?)\]', fields_list[5])
+                        # Check for an audio tag and extract the filename in one match
+                        audio_filename = _SOUND_RE.search(fields_list[5])
                         if audio_filename:
+                            print(f"  ✅ Note has example audio tag: {fields_list[5]}")
+                        
                             filename = audio_filename.group(1)
                             print(f"  ✅ Example audio filename: {filename}")
-                            
+                        
                             # Check if this file should exist in the media mapping
-                            audio_id = None
-                            for k, v in media_json.items():
-                                if v == filename:
-                                    audio_id = k
-                                    break
-                                    
+                            audio_id = filename_to_id.get(filename)
                             if audio_id:
                                 print(f"  ✅ Found in media mapping as file: {audio_id}")
-                                
+                            
                                 # Check if the file actually exists in the package
-                                if os.path.exists(os.path.join(temp_dir, audio_id)):
-                                    audio_size = os.path.getsize(os.path.join(temp_dir, audio_id))
+                                audio_size = file_sizes.get(audio_id)
+                                if audio_size is not None:
                                     print(f"  ✅ Audio file exists in package: {audio_id} ({audio_size} bytes)")
                                 else:
                                     print(f"  ❌ Audio file not found in package: {audio_id}")
                             else:
                                 print(f"  ❌ Audio file not found in media mapping: {filename}")
+                        else:
+                            print(f"  ❌ Note does not have example audio tag")
                     else:
-                        print(f"  ❌ Note does not have example audio tag")
-                else:
-                    print(f"  Note has {len(fields_list)} fields (expected 6)")
-                    print(f"  Fields: {fields_list}")
+                        print(f"  Note has {len(fields_list)} fields (expected 6)")
+                        print(f"  Fields: {fields_list}")
             
-            conn.close()
+                conn.close()
         
-        return True
-    except Exception as e:
-        print(f"Error examining package: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return False
-    finally:
-        # Clean up the temporary directory
-        import shutil
-        shutil.rmtree(temp_dir)
+            return True
+        except Exception as e:
+            print(f"Error examining package: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
 
 if __name__ == "__main__":
     print("=== Example Sentence and Audio Debug ===\n")
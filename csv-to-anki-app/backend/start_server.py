@@ -5,25 +5,56 @@ This ensures the app module can be found correctly.
 """
 import os
 import sys
-import uvicorn
+import argparse
 
 # Add the parent directory to the Python path to find the app module
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)  # Backend directory
 
+def pick_server_options(dev: bool) -> dict:
+    """Choose the uvicorn event loop and HTTP parser, preferring the faster C implementations"""
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+    # The reloader's file watcher and worker restarts are only worth it while editing code
+    return {"loop": loop, "http": http, "reload": dev}
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Start the CSV to Anki backend server")
+    parser.add_argument('--dev', action='store_true', help='Reload the server when the code changes')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes (ignored with --dev); collections are kept '
+                             'in memory per process, so more than one needs sticky clients')
+    args = parser.parse_args()
+    
     try:
         print("Starting CSV to Anki backend server...")
         print(f"Server will be available at http://localhost:8000")
         print(f"Python path includes: {sys.path[:3]}")
         print("Press Ctrl+C to stop the server")
         
+        options = pick_server_options(args.dev)
+        print(f"Mode: {'development (auto-reload)' if args.dev else 'production'}, "
+              f"event loop: {options['loop']}, HTTP parser: {options['http']}")
+        
+        # Imported after the banner so it shows right away; a missing uvicorn
+        # is then reported by the ModuleNotFoundError handler below
+        import uvicorn
+        
         # Start the server with the correct app import path
         uvicorn.run("app.main:app", 
                     host="0.0.0.0", 
                     port=8000, 
-                    reload=True,
-                    log_level="info")
+                    workers=1 if args.dev else args.workers,
+                    log_level="info",
+                    **options)
     except ModuleNotFoundError as e:
         print(f"Error: {e}")
         print("\nTroubleshooting tips:")
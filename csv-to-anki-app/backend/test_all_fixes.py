@@ -13,6 +13,7 @@ import sys
 import tempfile
 import zipfile
 import sqlite3
+from urllib.request import pathname2url
 import json
 import datetime
 import random
@@ -28,7 +29,7 @@ TEST_CSV = """Japanese,English,Reading,Example,Tags
 学生,student,がくせい,彼は学生です。(He is a student.),person
 先生,teacher,せんせい,先生はとても親切です。(The teacher is very kind.),person"""
 
-def test_example_functionality():
+def test_example_functionality(base_dir=None):
     """Test the example sentences and audio functionality"""
     print("\n=== Testing Example Sentences and Audio Fixes ===")
     
@@ -57,8 +58,8 @@ def test_example_functionality():
     print(f"✓ Created Core 2000 package at: {core2000_path}")
     
     # Examine the packages
-    examine_package(standard_path, "Standard Format")
-    examine_package(core2000_path, "Core 2000 Format")
+    examine_package(standard_path, "Standard Format", base_dir=base_dir)
+    examine_package(core2000_path, "Core 2000 Format", base_dir=base_dir)
     
     return standard_path, core2000_path
 
@@ -72,9 +73,11 @@ def test_enhanced_tags():
     # Test words to check tag generation
     test_words = ["猫", "食べる", "赤い", "一", "学校", "新しい"]
     
-    for word in test_words:
+    # Look up every word as one batch instead of one request at a time
+    word_infos = enrich_service.lookup_words(test_words)
+    
+    for word, word_info in word_infos.items():
         print(f"\nTesting tag generation for '{word}':")
-        word_info = enrich_service.lookup_word(word)
         
         # Create enriched info
         tags = []
@@ -101,57 +104,71 @@ def test_enhanced_tags():
     
     return True
 
-def examine_package(package_path, package_type):
+def examine_package(package_path, package_type, base_dir=None):
     """Examine an Anki package to verify example sentences and audio"""
+    if base_dir is None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            return examine_package(package_path, package_type, base_dir=temp_dir)
+    
     print(f"\n=== Examining {package_type} Package: {os.path.basename(package_path)} ===")
     
     if not os.path.exists(package_path):
         print(f"Error: Package doesn't exist at {package_path}")
         return False
     
-    temp_dir = tempfile.mkdtemp()
+    # Only the collection database is written to disk, since sqlite3 needs a path;
+    # everything else is read straight from the zip. The file lives in base_dir,
+    # which the caller shares across packages and removes once at the end.
+    db_path = os.path.join(base_dir, f"{package_type.replace(' ', '_')}.anki2")
     
     try:
-        # Extract the package contents
         with zipfile.ZipFile(package_path, 'r') as zip_ref:
-            zip_ref.extractall(temp_dir)
-        
-        # Examine the media files
-        print("\nMedia files:")
-        media_files = [f for f in os.listdir(temp_dir) if f not in ['collection.anki2', 'media']]
-        print(f"Found {len(media_files)} media files")
-        
-        # Examine the media mapping
-        media_mapping = {}
-        media_file = os.path.join(temp_dir, 'media')
-        if os.path.exists(media_file):
-            print("Media mapping file exists")
-            try:
-                with open(media_file, 'r') as f:
-                    media_mapping = json.load(f)
-                print(f"Media mapping contains {len(media_mapping)} entries")
-                
-                # Count example audio files in mapping
-                example_audio_count = sum(1 for filename in media_mapping.values() if filename.startswith('example_'))
-                print(f"Found {example_audio_count} example audio files in mapping")
-            except Exception as e:
-                print(f"Error reading media mapping: {str(e)}")
-        else:
-            print("Media mapping file not found")
+            names = zip_ref.namelist()
+            
+            # Examine the media files
+            print("\nMedia files:")
+            media_files = [f for f in names if f not in ['collection.anki2', 'media']]
+            print(f"Found {len(media_files)} media files")
+            
+            # Examine the media mapping
+            media_mapping = {}
+            if 'media' in names:
+                print("Media mapping file exists")
+                try:
+                    media_mapping = json.loads(zip_ref.read('media'))
+                    print(f"Media mapping contains {len(media_mapping)} entries")
+                    
+                    # Bucket the audio files in one walk over the mapping
+                    example_audio_files = []
+                    vocab_audio_files = []
+                    for filename in media_mapping.values():
+                        if filename.endswith('.mp3'):
+                            (example_audio_files if filename.startswith('example_') else vocab_audio_files).append(filename)
+                    print(f"Found {len(example_audio_files)} example audio files in mapping")
+                    print(f"Found {len(vocab_audio_files)} vocabulary audio files in mapping")
+                except Exception as e:
+                    print(f"Error reading media mapping: {str(e)}")
+            else:
+                print("Media mapping file not found")
+            
+            has_db = 'collection.anki2' in names
+            if has_db:
+                with zip_ref.open('collection.anki2') as src, open(db_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
         
         # Examine the database
-        db_path = os.path.join(temp_dir, 'collection.anki2')
-        if os.path.exists(db_path):
+        if has_db:
             print("\nExamining database...")
-            conn = sqlite3.connect(db_path)
+            # Read-only, with a large page cache and memory-mapped reads for the table scans
+            conn = sqlite3.connect(f"file:{pathname2url(db_path)}?mode=ro", uri=True)
+            conn.execute("PRAGMA cache_size=-65536")
+            conn.execute("PRAGMA mmap_size=268435456")
             cursor = conn.cursor()
             
             # Check for Example field in model
             print("Checking for Example field in models...")
             cursor.execute("SELECT id, name, flds FROM models")
-            models = cursor.fetchall()
-            
-            for model_id, model_name, fields in models:
+            for model_id, model_name, fields in cursor:
                 field_names = fields.split("\x1f")
                 print(f"Model: {model_name}")
                 print(f"Fields: {field_names}")
@@ -164,15 +181,16 @@ def examine_package(package_path, package_type):
             
             # Check the note fields
             print("\nChecking note fields...")
-            cursor.execute("SELECT id, flds FROM notes")
-            notes = cursor.fetchall()
-            print(f"Found {len(notes)} notes")
+            note_count = cursor.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+            print(f"Found {note_count} notes")
             
             example_count = 0
             example_audio_count = 0
             
-            for note_id, fields in notes:
-                field_values = fields.split("\x1f")
+            cursor.execute("SELECT id, flds FROM notes")
+            for note_id, fields in cursor:
+                # Only the first 6 fields are used; the rest stay in one trailing item
+                field_values = fields.split("\x1f", 6)
                 
                 # Check if the note has 6 fields (with ExampleAudio being the 6th)
                 if len(field_values) >= 4:  # At least has Example field
@@ -201,16 +219,14 @@ def examine_package(package_path, package_type):
         import traceback
         traceback.print_exc()
         return False
-    
-    finally:
-        # Clean up
-        shutil.rmtree(temp_dir)
 
 if __name__ == "__main__":
     print("=== All Fixes Verification ===\n")
     
-    # Test example sentences and audio
-    standard_path, core2000_path = test_example_functionality()
+    # One scratch directory for every package examined in this run
+    with tempfile.TemporaryDirectory() as base:
+        # Test example sentences and audio
+        standard_path, core2000_path = test_example_functionality(base_dir=base)
     
     # Test enhanced tag generation
     tag_test_result = test_enhanced_tags()
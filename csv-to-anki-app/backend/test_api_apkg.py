@@ -3,13 +3,23 @@
 Test API for .apkg generation
 """
 
+import atexit
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
 
 # The base URL for our API
 BASE_URL = "http://localhost:8003/api/deck"
 
+# One keep-alive session for every call, so each request skips the TCP handshake
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+atexit.register(SESSION.close)
+
+# Bytes written per chunk when saving the downloaded package
+DOWNLOAD_CHUNK_SIZE = 128 * 1024
+
 # Test data
 ANKI_FORMAT_CSV = """#separator:tab
 #html:true
@@ -30,7 +40,7 @@ def test_api_apkg():
         'file': ('japanese_anki.csv', ANKI_FORMAT_CSV, 'text/csv')
     }
     
-    response = requests.post(f"{BASE_URL}/upload", files=files)
+    response = SESSION.post(f"{BASE_URL}/upload", files=files)
     
     if response.status_code != 200:
         print(f"Failed to upload CSV: {response.status_code}")
@@ -51,7 +61,7 @@ def test_api_apkg():
         'deck_name': 'API Generated Deck'
     }
     
-    response = requests.post(f"{BASE_URL}/create", data=form_data)
+    response = SESSION.post(f"{BASE_URL}/create", data=form_data)
     
     if response.status_code != 201:
         print(f"Failed to create deck: {response.status_code}")
@@ -70,17 +80,18 @@ def test_api_apkg():
     download_url = f"{BASE_URL}/download/{deck_id}"
     print(f"Downloading from: {download_url}")
     
-    response = requests.get(download_url)
-    
-    if response.status_code != 200:
-        print(f"Download failed: {response.status_code}")
-        print(response.text)
-        return
-    
-    # Save the downloaded file
-    output_file = "api_output.apkg"
-    with open(output_file, "wb") as f:
-        f.write(response.content)
+    # Stream the body to disk in chunks instead of holding the whole package in memory
+    with SESSION.get(download_url, stream=True) as response:
+        if response.status_code != 200:
+            print(f"Download failed: {response.status_code}")
+            print(response.text)
+            return
+        
+        # Save the downloaded file
+        output_file = "api_output.apkg"
+        with open(output_file, "wb") as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
     
     file_size = os.path.getsize(output_file)
     print(f"Downloaded file saved to {output_file} ({file_size} bytes)")
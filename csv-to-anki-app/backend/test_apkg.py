@@ -7,8 +7,11 @@ import genanki
 import random
 from io import StringIO
 import csv
+import itertools
 import textwrap
 
+from app.services.tags import TAG_TABLE
+
 # Test data
 ANKI_FORMAT_CSV = """#separator:tab
 #html:true
@@ -20,6 +23,43 @@ ANKI_FORMAT_CSV = """#separator:tab
 はい	Yes	basic
 いいえ	No	basic"""
 
+def parse_note_rows(csv_reader):
+    """
+    Parse CSV rows into (front, back, tags) for the notes, skipping a header row
+
+    Only the tokenizing and cleaning happens here, so the genanki work stays in
+    the caller's loop.
+    """
+    first_row = next(csv_reader, None)
+    if first_row is None:
+        return
+    if first_row and first_row[0].lower() in ['front']:
+        # Skip header if present
+        print(f"Skipping header row: {first_row}")
+        rows = csv_reader
+    else:
+        rows = itertools.chain([first_row], csv_reader)
+
+    for row in rows:
+        if len(row) < 2:
+            continue
+            
+        front = row[0].strip()
+        back = row[1].strip()
+        
+        if not front or not back:
+            continue
+            
+        # Process tags
+        tags = []
+        if len(row) >= 3 and row[2].strip():
+            for tag in row[2].split(','):
+                clean_tag = tag.strip().translate(TAG_TABLE)
+                if clean_tag:
+                    tags.append(clean_tag)
+        
+        yield front, back, tags
+
 def test_apkg_creation():
     """Test direct creation of an .apkg file"""
     
@@ -61,55 +101,33 @@ def test_apkg_creation():
     anki_deck = genanki.Deck(deck_id, deck_name)
     
     # Process the CSV content
-    lines = ANKI_FORMAT_CSV.strip().split('\n')
+    content = ANKI_FORMAT_CSV.strip()
     
     # Check for Anki format directives
-    metadata_count = 0
+    body_offset = 0
     dialect = 'excel'
     
-    if lines[0].startswith('#separator:'):
+    if content.startswith('#separator:'):
         print("Detected Anki format directives")
-        for line in lines:
-            if line.startswith('#'):
-                metadata_count += 1
-                print(f"Metadata: {line}")
-            else:
-                break
+        # Step over the metadata lines by offset, so the body is never split and re-joined
+        while content.startswith('#', body_offset):
+            line_end = content.find('\n', body_offset)
+            if line_end == -1:
+                line_end = len(content)
+            print(f"Metadata: {content[body_offset:line_end]}")
+            body_offset = line_end + 1
         
         # Use tab as separator for Anki format
-        if '#separator:tab' in lines[0].lower():
+        if '#separator:tab' in content.partition('\n')[0].lower():
             dialect = 'excel-tab'
             print("Using tab separator")
         
     # Extract actual content
-    content = '\n'.join(lines[metadata_count:])
-    csv_file = StringIO(content)
+    csv_file = StringIO(content[body_offset:])
     csv_reader = csv.reader(csv_file, dialect=dialect)
     
     cards_added = 0
-    for i, row in enumerate(csv_reader):
-        if i == 0 and row[0].lower() in ['front']: 
-            # Skip header if present
-            print(f"Skipping header row: {row}")
-            continue
-            
-        if len(row) < 2:
-            continue
-            
-        front = row[0].strip()
-        back = row[1].strip()
-        
-        if not front or not back:
-            continue
-            
-        # Process tags
-        tags = []
-        if len(row) >= 3 and row[2].strip():
-            for tag in row[2].split(','):
-                clean_tag = ''.join(c if c.isalnum() or c == '_' else '_' for c in tag.strip())
-                if clean_tag:
-                    tags.append(clean_tag)
-        
+    for front, back, tags in parse_note_rows(csv_reader):
         print(f"Creating note - Front: '{front}', Back: '{back}', Tags: {tags}")
         
         # Create a note with the Basic model
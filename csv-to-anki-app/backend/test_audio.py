@@ -6,6 +6,10 @@ import os
 import sys
 import tempfile
 import genanki
+
+# Keep generated speech between runs, next to the Jisho cache, so repeated runs skip gTTS
+os.environ.setdefault("ANKI_TTS_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "anki-japanese-app", "tts"))
+
 from app.services.enrich_service import EnrichService
 from app.services.anki_utils import create_anki_package_from_csv
 
@@ -32,13 +36,7 @@ def test_audio_generation():
         print(f"✗ Failed to generate audio for '{japanese_word}'")
         return False
     
-    # Clean up
-    try:
-        os.remove(audio_path)
-        print("✓ Successfully cleaned up audio file")
-    except:
-        print("✗ Failed to clean up audio file")
-    
+    # The file is left in the TTS cache, so later runs reuse it instead of calling gTTS again
     return True
 
 def test_anki_package_with_audio():
@@ -15,9 +15,18 @@ import zipfile
 import random
 import datetime
 import sqlite3
+import shutil
+from urllib.request import pathname2url
+
+# Keep generated speech between runs, next to the Jisho cache, so repeated runs skip gTTS
+os.environ.setdefault("ANKI_TTS_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "anki-japanese-app", "tts"))
+
 from app.services.enrich_service import EnrichService
 from app.services.anki_utils import create_anki_package_from_csv
 
+# Buffer size for copying the collection database out of the package
+COPY_BUFFER_SIZE = 128 * 1024
+
 # Sample CSV with Japanese content
 TEST_CSV = """Japanese,English,Reading,Example,Tags
 猫,cat,ねこ,猫が好き (I like cats),animal
@@ -33,48 +42,49 @@ def inspect_apkg_file(apkg_path):
     print(f"\n--- Inspecting Anki package: {apkg_path} ---")
     print(f"File size: {os.path.getsize(apkg_path)} bytes")
     
-    # Extract to a temporary directory
+    # Scratch directory for the collection database; nothing else is extracted
     temp_dir = tempfile.mkdtemp()
     
     try:
         # Anki packages are just zip files
         with zipfile.ZipFile(apkg_path, 'r') as z:
             print("\nContents of the .apkg file:")
-            files = z.namelist()
-            for f in files:
-                info = z.getinfo(f)
-                print(f"  - {f} ({info.file_size} bytes)")
-            
-            # Extract files
-            z.extractall(temp_dir)
+            # Member sizes come from the zip directory, so the media is never written out
+            file_sizes = {info.filename: info.file_size for info in z.infolist()}
+            for f, file_size in file_sizes.items():
+                print(f"  - {f} ({file_size} bytes)")
             
             # Audio files should be at the root level
-            audio_files = [f for f in files if f.endswith('.mp3')]
+            audio_files = [f for f in file_sizes if f.endswith('.mp3')]
             if audio_files:
                 print(f"\nFound {len(audio_files)} audio files in the package:")
                 for audio in audio_files:
-                    audio_path = os.path.join(temp_dir, audio)
-                    print(f"  - {audio} ({os.path.getsize(audio_path)} bytes)")
+                    print(f"  - {audio} ({file_sizes[audio]} bytes)")
             else:
                 print("\nNo audio files found in the package!")
 
-            # Check if media file is referenced in the database
+            # Only the collection database is copied out, since sqlite3 needs a path
             db_path = os.path.join(temp_dir, "collection.anki2")
-            if os.path.exists(db_path):
+            # Read-only and immutable: the queries are one-shot SELECTs on a private copy,
+            # so SQLite can skip locking and journal checks
+            db_uri = f"file:{pathname2url(db_path)}?mode=ro&immutable=1"
+            if "collection.anki2" in file_sizes:
+                with z.open("collection.anki2") as src, open(db_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+                
                 try:
-                    conn = sqlite3.connect(db_path)
+                    conn = sqlite3.connect(db_uri, uri=True, cached_statements=0)
                     cursor = conn.cursor()
                     
-                    # Get notes with sound references
+                    # Get notes with sound references; SQLite does the matching and
+                    # trimming, so only the matching notes' previews reach Python
                     print("\nChecking note fields for sound references...")
-                    cursor.execute("SELECT id, flds FROM notes")
-                    notes = cursor.fetchall()
+                    cursor.execute("SELECT id, substr(flds, 1, 80) FROM notes WHERE instr(flds, '[sound:') > 0")
                     
                     sound_refs_found = False
-                    for note_id, fields in notes:
-                        if "[sound:" in fields:
-                            print(f"  Note {note_id} contains sound reference: {fields[:80]}...")
-                            sound_refs_found = True
+                    for note_id, fields in cursor:
+                        print(f"  Note {note_id} contains sound reference: {fields}...")
+                        sound_refs_found = True
                     
                     if not sound_refs_found:
                         print("  No sound references found in notes!")
@@ -87,7 +97,7 @@ def inspect_apkg_file(apkg_path):
                 
         print("\nVerifying card templates for audio playback:")
         try:
-            conn = sqlite3.connect(db_path)
+            conn = sqlite3.connect(db_uri, uri=True, cached_statements=0)
             cursor = conn.cursor()
             cursor.execute("SELECT id, name, qfmt, afmt FROM templates")
             templates = cursor.fetchall()
@@ -118,8 +128,7 @@ def inspect_apkg_file(apkg_path):
         traceback.print_exc()
         return False
     finally:
-        # Clean up - comment this out if you need to keep the extracted files
-        import shutil
+        # Clean up - comment this out if you need to keep the extracted database
         shutil.rmtree(temp_dir)
 
 def create_test_audio_package():
@@ -138,9 +147,10 @@ def create_test_audio_package():
         if hasattr(package, 'media_files') and package.media_files:
             print(f"Package has {len(package.media_files)} media files:")
             for media_file in package.media_files:
-                if os.path.exists(media_file):
-                    print(f"  - {media_file} ({os.path.getsize(media_file)} bytes)")
-                else:
+                # One stat per file answers both "does it exist" and "how big is it"
+                try:
+                    print(f"  - {media_file} ({os.stat(media_file).st_size} bytes)")
+                except FileNotFoundError:
                     print(f"  - {media_file} [FILE NOT FOUND]")
         else:
             print("Warning: Package has no media files!")
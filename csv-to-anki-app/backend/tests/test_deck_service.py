@@ -0,0 +1,33 @@
+# Deck Service Tests
+
+from app.services.deck_service import DeckService
+
+ENRICHED_CSV = """Japanese,English,Reading,Example,Tags
+猫,cat,ねこ,猫が好きです。 (I like cats.),noun common
+犬,dog,いぬ,,
+hello,"greeting, hi",,,
+水,water
+"""
+
+def test_enriched_csv_fast_path():
+    """Test the enriched CSV header is parsed into reading/example/tag fields"""
+    deck = DeckService().create_deck_from_csv(ENRICHED_CSV, "Enriched")
+    assert deck.is_enriched
+    assert [card.front for card in deck.cards] == ["猫", "犬", "hello", "水"]
+
+    cat, dog, hello, water = deck.cards
+    assert cat.reading == "ねこ"
+    assert cat.example == "猫が好きです。 (I like cats.)"
+    assert cat.tags == ["noun", "common"]
+    assert dog.tags == ["japanese"]
+    assert hello.back == "greeting, hi"
+    assert hello.tags == []
+    assert water.back == "water"
+    assert water.reading == ""
+
+def test_standard_csv_tags_in_third_column():
+    """Test a non-enriched CSV still treats the third column as tags"""
+    csv_content = "Japanese,English,Tags\n猫,cat,animal\n"
+    deck = DeckService().create_deck_from_csv(csv_content, "Standard")
+    assert not deck.is_enriched
+    assert deck.cards[0].tags == ["animal"]
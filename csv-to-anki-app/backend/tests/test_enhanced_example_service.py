@@ -0,0 +1,127 @@
+# Enhanced Example Service Tests
+
+from app.services.enhanced_example_service import EnhancedExampleService, ExampleBatch
+
+def make_batch(*rows):
+    """Build an example batch from (japanese, english, score) rows"""
+    batch = ExampleBatch()
+    for japanese, english, score in rows:
+        batch.append(japanese, english, score)
+    return batch
+
+def make_service(**sources):
+    """Create a service whose sources are replaced by offline stubs"""
+    service = EnhancedExampleService(cache_path=":memory:")
+    service.sources = sources
+    return service
+
+def test_find_best_example_ranks_across_sources():
+    """Test examples from every source are merged and ranked by quality"""
+    def tatoeba(word, max_examples):
+        return make_batch(('猫', 'Cat.', 2.0))
+
+    def jisho(word, max_examples):
+        return make_batch(('私は猫が好きです。', 'I like cats.', 4.1))
+
+    service = make_service(tatoeba=tatoeba, jisho=jisho)
+    examples = service.find_best_example('猫', max_examples=3)
+    assert [e['source'] for e in examples] == ['jisho', 'tatoeba']
+    assert examples[0]['english'] == 'I like cats.'
+
+def test_failing_source_is_skipped():
+    """Test an exception from one source does not lose the others"""
+    def broken(word, max_examples):
+        raise ConnectionError("offline")
+
+    def jisho(word, max_examples):
+        return make_batch(('猫が好き。', 'I like cats.', 3.0))
+
+    service = make_service(tatoeba=broken, jisho=jisho)
+    assert service.get_example_with_fallback('猫') == ('猫が好き。', 'I like cats.')
+
+def test_find_best_examples_bulk():
+    """Test bulk lookups return one entry per distinct word"""
+    def tatoeba(word, max_examples):
+        return make_batch((f'{word}です。', word, 3.0))
+
+    service = make_service(tatoeba=tatoeba)
+    results = service.find_best_examples_bulk(['猫', '犬', '猫'], max_examples=1)
+    assert list(results) == ['猫', '犬']
+    assert results['犬'][0]['japanese'] == '犬です。'
+
+def test_cache_survives_new_instance(tmp_path):
+    """Test examples are served from the on-disk cache by a new service"""
+    cache_path = str(tmp_path / "examples.sqlite3")
+    calls = []
+
+    def tatoeba(word, max_examples):
+        calls.append(word)
+        return make_batch(('猫です。', 'It is a cat.', 3.0))
+
+    first = EnhancedExampleService(cache_path=cache_path)
+    first.sources = {'tatoeba': tatoeba}
+    expected = first.find_best_example('猫', max_examples=1)
+
+    second = EnhancedExampleService(cache_path=cache_path)
+    second.sources = {'tatoeba': tatoeba}
+    assert second.find_best_example('猫', max_examples=1) == expected
+    assert calls == ['猫']
+
+    second.clear_cache_for('猫')
+    second.find_best_example('猫', max_examples=1)
+    assert calls == ['猫', '猫']
+
+def test_quality_score_counts_distinct_particles():
+    """Test particles are counted once each, including で inside まで"""
+    service = make_service()
+    # 10 chars (+1.0), contains word (+2.0), punctuation (+0.5), で/まで/に (+0.6)
+    assert abs(service._calculate_quality_score('駅まで猫に会いに行く。', '猫') - 4.1) < 1e-9
+    assert service._calculate_quality_score('猫', '犬') == 0.0
+
+def test_stops_waiting_when_no_source_can_do_better():
+    """Test later sources are skipped once the top examples can't be beaten"""
+    import threading
+    release = threading.Event()
+
+    def tatoeba(word, max_examples):
+        return make_batch(('駅まで猫に会いに行きは。', 'Perfect.', 4.5))
+
+    def jisho(word, max_examples):
+        release.wait(5)
+        return make_batch(('猫', 'Cat.', 2.0))
+
+    service = make_service(tatoeba=tatoeba, jisho=jisho)
+    examples = service.find_best_example('猫', max_examples=1)
+    release.set()
+    assert [e['source'] for e in examples] == ['tatoeba']
+
+def test_tatoeba_circuit_breaker(monkeypatch):
+    """Test Tatoeba is skipped after repeated failures"""
+    from app.services import enhanced_example_service as module
+    calls = []
+
+    def failing_get(*args, **kwargs):
+        calls.append(args)
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(module._HTTP_SESSION, 'get', failing_get)
+    monkeypatch.setitem(module._BREAKER, 'tatoeba', {'failures': 0, 'open_until': 0.0})
+
+    service = make_service()
+    for _ in range(module.BREAKER_THRESHOLD + 2):
+        assert len(service._get_tatoeba_examples('猫')) == 0
+    assert len(calls) == module.BREAKER_THRESHOLD
+
+def test_single_best_matches_ranked_lookup():
+    """Test the max_examples=1 path picks the same example as full ranking"""
+    def tatoeba(word, max_examples):
+        return make_batch(('猫', 'Cat.', 2.0), ('猫がいる。', 'There is a cat.', 3.5))
+
+    def jisho(word, max_examples):
+        return make_batch(('猫が好き。', 'I like cats.', 3.5), ('黒い猫', 'A black cat.', 3.0))
+
+    service = make_service(tatoeba=tatoeba, jisho=jisho)
+    single = service.find_best_example('猫', max_examples=1)
+    ranked = service.find_best_example('猫', max_examples=4)
+    assert single == ranked[:1]
+    assert single[0]['source'] == 'tatoeba'
@@ -0,0 +1,190 @@
+# Enrichment Service Tests
+
+import os
+
+from app.services import enrich_service as enrich_module
+from app.services.enrich_service import EnrichService
+
+class FakeTTS:
+    """Stand-in for gTTS that records calls instead of hitting the network"""
+    calls = []
+
+    def __init__(self, text, lang):
+        self.text = text
+        FakeTTS.calls.append((text, lang))
+
+    def save(self, filename):
+        with open(filename, 'wb') as f:
+            f.write(self.text.encode('utf-8'))
+
+def make_service(monkeypatch, tmp_path):
+    """Create a service whose audio goes to a temp cache through FakeTTS"""
+    FakeTTS.calls = []
+    monkeypatch.setattr(enrich_module, 'gTTS', FakeTTS)
+    monkeypatch.setattr(enrich_module, 'AUDIO_CACHE_DIR', str(tmp_path / "tts"))
+    return EnrichService(use_enhanced_examples=False)
+
+def test_audio_is_generated_once_per_text(monkeypatch, tmp_path):
+    """Test repeated words reuse the cached audio file"""
+    service = make_service(monkeypatch, tmp_path)
+    first = service.generate_audio('猫')
+    second = EnrichService(use_enhanced_examples=False).generate_audio('猫')
+
+    assert first == second
+    assert first.isascii() and first.endswith('.mp3')
+    assert FakeTTS.calls == [('猫', 'ja')]
+
+def test_example_audio_is_cached_with_example_prefix(monkeypatch, tmp_path):
+    """Test example audio speaks only the Japanese part and keeps the example_ prefix"""
+    service = make_service(monkeypatch, tmp_path)
+    path = service.generate_example_audio('猫が好きです。 (I like cats.)')
+
+    assert os.path.basename(path).startswith('example_')
+    assert path == service.generate_example_audio('猫が好きです。(I like cats.)')
+    assert not os.path.basename(service.generate_audio('猫')).startswith('example_')
+    assert FakeTTS.calls == [('猫が好きです。', 'ja'), ('猫', 'ja')]
+
+def test_enrich_vocabulary_keeps_input_order(monkeypatch, tmp_path):
+    """Test words enriched concurrently come back in input order, blanks skipped"""
+    import time
+    service = make_service(monkeypatch, tmp_path)
+
+    def lookup_word(word, examples_future=None):
+        time.sleep(0.01 * (5 - len(word)))  # Make earlier words finish last
+        return {"word": word, "meanings": [word.upper()]}
+
+    monkeypatch.setattr(service, 'lookup_word', lookup_word)
+    words = ['a', 'bb', ' ', 'ccc', 'dddd']
+    enriched = service.enrich_vocabulary(words)
+
+    assert [info["word"] for info in enriched] == ['a', 'bb', 'ccc', 'dddd']
+    assert enriched[2]["meanings"] == ['CCC']
+    assert all(info["audio_path"] for info in enriched)
+
+def test_example_audio_extracts_japanese_part(monkeypatch, tmp_path):
+    """Test each supported example format is reduced to its Japanese sentence"""
+    service = make_service(monkeypatch, tmp_path)
+    for example in ['猫が好きです。(I like cats.)', '猫が好きです。 - I like cats.',
+                    '猫が好きです。\nI like cats.', ' 猫が好きです。 ']:
+        service.generate_example_audio(example)
+    assert service.generate_example_audio('(I like cats.)') == ""
+    assert service.generate_example_audio('I like cats.') == ""
+
+    assert {text for text, _ in FakeTTS.calls} == {'猫が好きです。'}
+
+def test_get_romaji_batch_matches_single_words(monkeypatch, tmp_path):
+    """Test batch romaji conversion is aligned with its input, duplicates included"""
+    service = make_service(monkeypatch, tmp_path)
+    words = ['猫', '食べる', '猫', '東京タワー']
+    assert service.get_romaji_batch(words) == [service.get_romaji(word) for word in words]
+
+def test_enriched_csv_quotes_fields_once(monkeypatch, tmp_path):
+    """Test fields with commas and quotes round-trip through the csv module"""
+    import csv
+    service = make_service(monkeypatch, tmp_path)
+    monkeypatch.setattr(service, '_iter_enriched', lambda words: iter([{
+        "word": "猫",
+        "reading": "ねこ",
+        "meanings": ['cat', 'the "cat", a pet'],
+        "examples": [{"japanese": "猫、好き。", "english": "Cats, I like."}],
+    }]))
+
+    rows = list(csv.reader(service.create_enriched_csv(['猫']).splitlines()))
+    assert rows[0] == ["Japanese", "English", "Reading", "Example", "Tags"]
+    assert rows[1][:4] == ["猫", 'cat; the "cat", a pet', "ねこ", "猫、好き。 (Cats, I like.)"]
+
+    tab_lines = service.create_enriched_csv(['猫'], format_type="anki_tab").splitlines()
+    assert tab_lines[:2] == ["#separator:tab", "#html:true"]
+    assert list(csv.reader(tab_lines[3:], delimiter='\t'))[0][1] == 'cat; the "cat", a pet'
+
+def test_examples_are_prefetched_per_word(monkeypatch, tmp_path):
+    """Test each distinct word's examples resolve without waiting for the other words"""
+    import threading
+    service = make_service(monkeypatch, tmp_path)
+    release_cat = threading.Event()
+    calls = []
+
+    class FakeExamples:
+        def find_best_example(self, word, max_examples):
+            calls.append(word)
+            if word == '猫':
+                release_cat.wait(timeout=5)
+            return [{"japanese": f"{word}です。", "english": word}]
+
+    service.use_enhanced_examples = True
+    service.enhanced_example_service = FakeExamples()
+    futures = service._prefetch_examples(['猫', '犬', '猫'])
+
+    assert futures['犬'].result(timeout=5) == [{"japanese": "犬です。", "english": "犬"}]
+    assert not futures['猫'].done()
+    release_cat.set()
+    assert futures['猫'].result(timeout=5) == [{"japanese": "猫です。", "english": "猫"}]
+    assert sorted(calls) == ['犬', '猫']
+
+def test_failed_tts_leaves_no_partial_files(monkeypatch, tmp_path):
+    """Test a failed gTTS call doesn't leave a temp or empty file in the cache"""
+    service = make_service(monkeypatch, tmp_path)
+
+    class BrokenTTS(FakeTTS):
+        def save(self, filename):
+            super().save(filename)
+            raise ConnectionError("offline")
+
+    monkeypatch.setattr(enrich_module, 'gTTS', BrokenTTS)
+    assert service.generate_audio('猫') == ""
+    assert list((tmp_path / "tts").iterdir()) == []
+
+def test_enriched_csv_part_of_speech_tags(monkeypatch, tmp_path):
+    """Test part-of-speech tags are normalized, deduplicated and kept in order"""
+    import csv
+    service = make_service(monkeypatch, tmp_path)
+    monkeypatch.setattr(service, '_iter_enriched', lambda words: iter([
+        {"word": "食べる", "meanings": ["to eat"], "frequency": 500,
+         "parts_of_speech": ["Ichidan verb", "Transitive verb", "Ichidan verb"]},
+        {"word": "猫", "meanings": ["cat"], "parts_of_speech_clean": ["noun"]},
+    ]))
+
+    rows = list(csv.reader(service.create_enriched_csv(['食べる', '猫']).splitlines()))
+    assert rows[1][4] == "ichidan_verb transitive_verb jlpt_n5 food"
+    assert rows[2][4] == "noun single_character"
+
+def test_lookup_words_batches_distinct_words(monkeypatch, tmp_path):
+    """Test a batch lookup returns one result per distinct word, in input order"""
+    service = make_service(monkeypatch, tmp_path)
+    calls = []
+
+    def lookup_word(word, examples_future=None):
+        calls.append(word)
+        return {"word": word, "meanings": [f"meaning of {word}"]}
+
+    monkeypatch.setattr(service, 'lookup_word', lookup_word)
+    results = service.lookup_words(['猫', '犬', '猫'])
+    assert list(results) == ['猫', '犬']
+    assert results['犬'] == {"word": "犬", "meanings": ["meaning of 犬"]}
+    assert sorted(calls) == ['犬', '猫']
+    assert service.lookup_words([]) == {}
+
+def test_failed_word_does_not_truncate_csv(monkeypatch, tmp_path):
+    """Test a word whose enrichment raises still gets a row, and later words follow"""
+    import csv
+    service = make_service(monkeypatch, tmp_path)
+
+    def enrich_one(word, romaji, examples_future=None):
+        if word == '犬':
+            raise ConnectionError("offline")
+        return {"word": word, "meanings": [f"meaning of {word}"]}
+
+    monkeypatch.setattr(service, '_enrich_one', enrich_one)
+    rows = list(csv.reader(service.create_enriched_csv(['猫', '犬', '本']).splitlines()))
+    assert [row[0] for row in rows[1:]] == ['猫', '犬', '本']
+    assert rows[2][1] == ""
+    assert rows[3][1] == "meaning of 本"
+
+def test_repeated_word_audio_is_packaged_once(monkeypatch, tmp_path):
+    """Test rows sharing a word add its cached audio file to the package only once"""
+    from app.services.anki_utils import create_anki_package_from_csv
+    make_service(monkeypatch, tmp_path)
+    package = create_anki_package_from_csv("Japanese,English\n猫,cat\n犬,dog\n猫,cat\n", "Repeats")
+    assert [os.path.basename(path) for path in package.media_files] == [
+        os.path.basename(EnrichService(use_enhanced_examples=False).generate_audio(word)) for word in ('猫', '犬')
+    ]
@@ -0,0 +1,35 @@
+# Example Cache Tests
+
+from app.services.example_cache import ExampleCache
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    """Test the in-memory tier stays bounded and falls back to disk"""
+    cache = ExampleCache(str(tmp_path / "examples.sqlite3"), memory_size=2)
+    cache.set('猫', 1, [{'japanese': '猫です。'}])
+    cache.set('犬', 1, [{'japanese': '犬です。'}])
+    cache.get('猫', 1)  # 猫 is now the most recently used
+    cache.set('鳥', 1, [{'japanese': '鳥です。'}])
+
+    assert list(cache._memory) == [('猫', 1), ('鳥', 1)]
+    assert cache.get('犬', 1) == [{'japanese': '犬です。'}]
+    assert len(cache._memory) == 2
+
+def test_expired_entries_are_ignored():
+    """Test entries past their TTL are not returned from either tier"""
+    cache = ExampleCache(":memory:")
+    cache.set('猫', 1, [{'japanese': '猫です。'}], ttl=-1)
+    assert cache.get('猫', 1) is None
+    assert not cache._memory
+
+    cache.set('猫', 1, [{'japanese': '猫です。'}])
+    cache.delete('猫')
+    assert cache.get('猫', 1) is None
+
+def test_empty_results_use_shorter_ttl():
+    """Test lookups that found nothing expire sooner than real results"""
+    cache = ExampleCache(":memory:")
+    cache.set('猫', 1, [{'japanese': '猫です。'}])
+    cache.set('ぬ', 1, [])
+
+    assert cache.get('ぬ', 1) == []
+    assert cache._memory[('ぬ', 1)][1] < cache._memory[('猫', 1)][1] - 86400
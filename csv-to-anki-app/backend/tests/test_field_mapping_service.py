@@ -0,0 +1,44 @@
+# Field Mapping Service Tests
+
+from app.services.field_mapping_service import FieldMappingService
+
+def test_anki_directives_are_skipped():
+    """Test directive lines are dropped and #separator:tab picks the tab dialect"""
+    content = "#separator:tab\n#html:false\nJapanese\tEnglish\n猫\tcat\n"
+    headers, sample_data, mapping = FieldMappingService().analyze_csv_content(content)
+    assert headers == ['Japanese', 'English']
+    assert sample_data == [{'Japanese': '猫', 'English': 'cat'}]
+    assert mapping == {'japanese': 'Japanese', 'english': 'English'}
+
+def test_semicolon_delimiter_is_detected():
+    """Test a wide semicolon file is detected without being misled by colons"""
+    row = ";".join(f"a:{i}" for i in range(20))
+    content = "\n".join(["Word;Meaning;" + row] + [f"猫;cat;{row}"] * 2000)
+    headers, sample_data, _ = FieldMappingService().analyze_csv_content(content)
+    assert headers[:2] == ['Word', 'Meaning']
+    assert len(headers) == 22
+    assert len(sample_data) == 5
+
+def test_guess_dialect_prefers_consistent_delimiter():
+    """Test a delimiter on every line beats one that is only common in some fields"""
+    from app.services.field_mapping_service import guess_dialect
+    assert guess_dialect(['猫\tcat, kitty, feline', '犬\tdog']) == 'excel-tab'
+    assert guess_dialect(['猫;cat', '犬|dog']) == 'excel'
+    assert guess_dialect([]) == 'excel'
+
+def test_header_dialect_needs_a_single_delimiter():
+    """Test only a header with one repeated delimiter skips probing"""
+    from app.services.field_mapping_service import header_dialect
+    assert header_dialect('Japanese\tEnglish\tReading\n') == 'excel-tab'
+    assert header_dialect('Japanese,English,Reading\n') == 'excel'
+    assert header_dialect('Japanese;English;Notes, misc\n') is None
+    assert header_dialect('Japanese,English\n') is None
+
+def test_classify_cell_ignores_ascii_in_readings():
+    """Test ASCII mixed into kana still counts as a reading, unlike kanji"""
+    from app.services.field_mapping_service import _classify_cell
+    assert _classify_cell('ねこ (neko)') == (True, True, False)
+    assert _classify_cell('ねこ。') == (True, False, False)
+    assert _classify_cell('猫 cat') == (True, False, False)
+    assert _classify_cell('cat, feline') == (False, False, True)
+    assert _classify_cell('') == (False, False, False)
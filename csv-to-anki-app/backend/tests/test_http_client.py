@@ -0,0 +1,35 @@
+# Shared HTTP Client Tests
+
+from app.services import http_client
+
+class FakeResponse:
+    """Minimal stand-in for a requests.Response"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+def test_jisho_responses_are_cached_on_disk(monkeypatch, tmp_path):
+    """Test a word is fetched from Jisho once, then served from the disk cache"""
+    calls = []
+
+    def fake_get(url, params=None, timeout=None):
+        calls.append(params["keyword"])
+        return FakeResponse({"meta": {"status": 200}, "data": []})
+
+    monkeypatch.setattr(http_client.SESSION, "get", fake_get)
+    monkeypatch.setattr(http_client, "JISHO_CACHE_DIR", str(tmp_path))
+    http_client.jisho_word_request.cache_clear()
+
+    assert http_client.jisho_word_request("ぬぬぬ") is None
+    http_client.jisho_word_request.cache_clear()  # Force the disk tier
+    assert http_client.jisho_word_request("ぬぬぬ") is None
+
+    assert calls == ["ぬぬぬ"]
+    assert len(list(tmp_path.rglob("*.json"))) == 1
+    http_client.jisho_word_request.cache_clear()
@@ -45,7 +45,7 @@ start_backend() {
   fi
   
   # Start the backend server
-  python3 start_server.py &
+  python3 start_server.py --dev &
   BACKEND_PID=$!
   echo -e "${GREEN}Backend server started with PID: $BACKEND_PID${NC}"
   